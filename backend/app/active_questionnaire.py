@@ -0,0 +1,67 @@
+import hashlib
+import os
+
+from sqlalchemy import select
+
+from .cache import LRUCache, MISSING
+from .database import AsyncSessionLocal
+from .invalidation import invalidation_bus
+from .models import Questionnaire
+
+# ======================================================
+# ACTIVE QUESTIONNAIRE CACHE (PER DEPARTMENT)
+# ======================================================
+# Key: department_id, or None for "latest active in any department".
+# Value: {"id", "content", "etag"} or None when nothing is active.
+# Entries are dropped explicitly on activation, in every worker via the
+# invalidation bus; the TTL only bounds staleness from other writers.
+ACTIVE_CACHE_TTL = float(os.getenv("ACTIVE_QUESTIONNAIRE_TTL", "300"))
+
+active_cache = LRUCache(maxsize=1024, ttl=ACTIVE_CACHE_TTL)
+
+
+def _etag(q: Questionnaire) -> str:
+    digest = hashlib.sha1(q.content.encode("utf-8")).hexdigest()[:16]
+    return f'"q{q.id}-{digest}"'
+
+
+async def _load(department_id):
+    async with AsyncSessionLocal() as db:
+        query = select(Questionnaire).where(Questionnaire.is_active == True)
+        if department_id is not None:
+            query = query.where(Questionnaire.department_id == department_id)
+
+        q = await db.scalar(query.order_by(Questionnaire.created_at.desc()).limit(1))
+        if not q:
+            return None
+
+        return {"id": q.id, "content": q.content, "etag": _etag(q)}
+
+
+async def lookup_active(department_id=None):
+    entry = active_cache.get(department_id)
+    if entry is MISSING:
+        entry = await _load(department_id)
+        active_cache.set(department_id, entry)
+    return entry
+
+
+def invalidate_active(department_id=None):
+    """
+    Drops the department's entry plus the department-agnostic one, which
+    may point at the same questionnaire. No id clears everything.
+    """
+    _drop_active(department_id)
+    invalidation_bus.publish("active_questionnaire", department_id)
+
+
+def _drop_active(department_id):
+    if department_id is None:
+        active_cache.clear()
+        return
+
+    active_cache.invalidate(department_id)
+    active_cache.invalidate(None)
+
+
+invalidation_bus.subscribe("active_questionnaire", _drop_active)
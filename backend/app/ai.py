@@ -1,8 +1,25 @@
-from fastapi import APIRouter
+from fastapi import APIRouter, Depends
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
-from groq import Groq
+from sqlalchemy import delete, select
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, AsyncIterator, Optional
+from time import perf_counter
+import asyncio
+import hashlib
+import json
 import os
 
+from .cache import LRUCache, MISSING
+from .database import AsyncSessionLocal, dialect_insert
+from .deps import require_admin
+from .invalidation import invalidation_bus
+from .metrics import ai_latency
+from .models import AIReplyCache
+
+if TYPE_CHECKING:
+    from groq import AsyncGroq
+
 router = APIRouter(prefix="/ai", tags=["AI"])
 
 # ======================================================
@@ -12,45 +29,253 @@ class ChatSchema(BaseModel):
     message: str
 
 # ======================================================
-# GROQ CLIENT (LAZY INIT — FIXES WINDOWS RELOAD)
-# ======================================================
-def get_groq_client() -> Groq:
-    api_key = os.getenv("GROQ_API_KEY")
-    if not api_key:
-        raise RuntimeError("GROQ_API_KEY is not set")
-    return Groq(api_key=api_key)
-
-# ======================================================
-# CORE AI FUNCTION
-# ======================================================
-def ask_ai(prompt: str) -> str:
-    client = get_groq_client()
-
-    completion = client.chat.completions.create(
-        model="llama-3.1-8b-instant",
-        messages=[
-            {
-                "role": "system",
-                "content": (
-                    "You are Buddy, an intelligent university evaluation assistant. "
-                    "You generate professional, accurate, and context-aware responses. "
-                    "When asked to generate survey questions, return ONLY a JSON array "
-                    "of clear, measurable questions suitable for 1–5 star ratings."
-                )
-            },
-            {
-                "role": "user",
-                "content": prompt
-            }
-        ],
-        temperature=0.4
+# CONFIG
+# ======================================================
+GROQ_MODEL = os.getenv("GROQ_MODEL", "llama-3.1-8b-instant")
+GROQ_TEMPERATURE = 0.4
+
+# Point at a local fake completion server for tests/benchmarks,
+# e.g. GROQ_BASE_URL=http://127.0.0.1:9000 (see bench/fake_llm.py)
+GROQ_BASE_URL = os.getenv("GROQ_BASE_URL")
+GROQ_TIMEOUT = float(os.getenv("GROQ_TIMEOUT", "30"))
+
+# Reply cache: bounded LRU with TTL, optionally backed by the database
+AI_CACHE_SIZE = int(os.getenv("AI_CACHE_SIZE", "1024"))
+AI_CACHE_TTL = float(os.getenv("AI_CACHE_TTL", "86400"))
+AI_CACHE_PERSIST = os.getenv("AI_CACHE_PERSIST", "0") == "1"
+
+SYSTEM_PROMPT = (
+    "You are Buddy, an intelligent university evaluation assistant. "
+    "You generate professional, accurate, and context-aware responses. "
+    "When asked to generate survey questions, return ONLY a JSON array "
+    "of clear, measurable questions suitable for 1–5 star ratings."
+)
+
+# ======================================================
+# GROQ CLIENT (LONG-LIVED, SHARED CONNECTION POOL)
+# ======================================================
+# groq (with httpx) takes ~100 ms to import, so it loads on the first AI
+# request instead of on every cold start.
+_client: Optional["AsyncGroq"] = None
+
+
+def get_groq_client() -> "AsyncGroq":
+    global _client
+
+    if _client is None:
+        from groq import AsyncGroq
+
+        api_key = os.getenv("GROQ_API_KEY")
+        if not api_key:
+            raise RuntimeError("GROQ_API_KEY is not set")
+        _client = AsyncGroq(api_key=api_key, base_url=GROQ_BASE_URL, timeout=GROQ_TIMEOUT)
+
+    return _client
+
+
+async def close_groq_client():
+    global _client
+
+    if _client is not None:
+        await _client.close()
+        _client = None
+
+# ======================================================
+# REPLY CACHE + SINGLE-FLIGHT
+# ======================================================
+reply_cache = LRUCache(maxsize=AI_CACHE_SIZE, ttl=AI_CACHE_TTL)
+cache_stats = {"hits": 0, "misses": 0, "coalesced": 0, "persisted_hits": 0}
+
+# key -> task for the upstream call currently answering that prompt
+_inflight = {}
+
+
+def cache_key(prompt: str, model: str = GROQ_MODEL, temperature: float = GROQ_TEMPERATURE) -> str:
+    normalized = " ".join(prompt.lower().split())
+    return hashlib.sha256(f"{model}|{temperature}|{normalized}".encode("utf-8")).hexdigest()
+
+
+async def _load_persisted(key: str) -> Optional[str]:
+    async with AsyncSessionLocal() as db:
+        return await db.scalar(
+            select(AIReplyCache.reply).where(
+                AIReplyCache.key == key,
+                AIReplyCache.created_at >= datetime.utcnow() - timedelta(seconds=AI_CACHE_TTL)
+            ).limit(1)
+        )
+
+
+async def _store_persisted(key: str, reply: str):
+    async with AsyncSessionLocal() as db:
+        stmt = dialect_insert(db)(AIReplyCache).values(
+            key=key, model=GROQ_MODEL, reply=reply, created_at=datetime.utcnow()
+        )
+        await db.execute(stmt.on_conflict_do_update(
+            index_elements=["key"],
+            set_={"reply": stmt.excluded.reply, "created_at": stmt.excluded.created_at}
+        ))
+        await db.commit()
+
+
+async def _remember(key: str, reply: str):
+    reply_cache.set(key, reply)
+    if AI_CACHE_PERSIST:
+        await _store_persisted(key, reply)
+
+
+async def clear_reply_cache():
+    """
+    Drops every cached reply (e.g. after changing the model or system
+    prompt): persisted rows, this worker's LRU and, via the bus, the
+    LRUs of the other workers.
+    """
+    if AI_CACHE_PERSIST:
+        async with AsyncSessionLocal() as db:
+            await db.execute(delete(AIReplyCache))
+            await db.commit()
+
+    reply_cache.clear()
+    invalidation_bus.publish("ai_reply_cache")
+
+
+invalidation_bus.subscribe("ai_reply_cache", lambda payload: reply_cache.clear())
+
+
+def _forget_inflight(key: str):
+    def done(task: asyncio.Task):
+        _inflight.pop(key, None)
+        # nobody may be left awaiting a failed call; mark it retrieved
+        if not task.cancelled():
+            task.exception()
+    return done
+
+# ======================================================
+# CORE AI FUNCTIONS
+# ======================================================
+def _messages(prompt: str):
+    return [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": prompt}
+    ]
+
+
+async def _complete(key: str, prompt: str) -> str:
+    if AI_CACHE_PERSIST:
+        reply = await _load_persisted(key)
+        if reply is not None:
+            cache_stats["persisted_hits"] += 1
+            reply_cache.set(key, reply)
+            return reply
+
+    completion = await get_groq_client().chat.completions.create(
+        model=GROQ_MODEL,
+        messages=_messages(prompt),
+        temperature=GROQ_TEMPERATURE
+    )
+
+    reply = completion.choices[0].message.content.strip()
+    await _remember(key, reply)
+    return reply
+
+
+async def ask_ai(prompt: str) -> str:
+    started = perf_counter()
+    key = cache_key(prompt)
+
+    reply = reply_cache.get(key)
+    if reply is not MISSING:
+        cache_stats["hits"] += 1
+        ai_latency.observe("cache", value=perf_counter() - started)
+        return reply
+
+    # concurrent identical prompts share one upstream call; the call runs
+    # as its own task so a disconnecting caller does not cancel it
+    task = _inflight.get(key)
+    if task is None:
+        cache_stats["misses"] += 1
+        source = "upstream"
+        task = asyncio.ensure_future(_complete(key, prompt))
+        _inflight[key] = task
+        task.add_done_callback(_forget_inflight(key))
+    else:
+        cache_stats["coalesced"] += 1
+        source = "coalesced"
+
+    try:
+        return await asyncio.shield(task)
+    except Exception:
+        source = "error"
+        raise
+    finally:
+        ai_latency.observe(source, value=perf_counter() - started)
+
+
+async def stream_ai(prompt: str) -> AsyncIterator[str]:
+    key = cache_key(prompt)
+
+    reply = reply_cache.get(key)
+    if reply is not MISSING:
+        cache_stats["hits"] += 1
+        yield reply
+        return
+
+    cache_stats["misses"] += 1
+    stream = await get_groq_client().chat.completions.create(
+        model=GROQ_MODEL,
+        messages=_messages(prompt),
+        temperature=GROQ_TEMPERATURE,
+        stream=True
     )
 
-    return completion.choices[0].message.content.strip()
+    parts = []
+    async for chunk in stream:
+        delta = chunk.choices[0].delta.content if chunk.choices else None
+        if delta:
+            parts.append(delta)
+            yield delta
+
+    await _remember(key, "".join(parts).strip())
+
+# ======================================================
+# SERVER-SENT EVENTS
+# ======================================================
+async def _sse_events(prompt: str):
+    try:
+        async for delta in stream_ai(prompt):
+            yield f"data: {json.dumps({'delta': delta})}\n\n"
+    except Exception:
+        yield f"event: error\ndata: {json.dumps({'detail': 'AI request failed'})}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def sse_reply(prompt: str) -> StreamingResponse:
+    return StreamingResponse(
+        _sse_events(prompt),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # ======================================================
 # ROUTER ENDPOINT
 # ======================================================
 @router.post("/chat")
-def ai_chat(data: ChatSchema):
-    return {"reply": ask_ai(data.message)}
+async def ai_chat(data: ChatSchema, stream: bool = False):
+    if stream:
+        return sse_reply(data.message)
+    return {"reply": await ask_ai(data.message)}
+
+
+@router.get("/cache/stats", dependencies=[Depends(require_admin)])
+def ai_cache_stats():
+    return {
+        **cache_stats,
+        "size": len(reply_cache),
+        "maxsize": reply_cache.maxsize,
+        "inflight": len(_inflight)
+    }
+
+
+@router.delete("/cache", dependencies=[Depends(require_admin)])
+async def ai_cache_clear():
+    await clear_reply_cache()
+    return {"message": "AI reply cache cleared"}
@@ -0,0 +1,191 @@
+from datetime import date, datetime, timedelta
+
+from sqlalchemy import Date, cast, func
+from sqlalchemy.orm import Session
+
+from .models import Questionnaire, EvaluationDailyRollup, EvaluationQuestionRollup
+from .rollups import UNDATED
+
+STAR_VALUES = (1, 2, 3, 4, 5)
+
+TREND_BUCKETS = ("day", "week", "month")
+# range used when the caller gives no `start`
+TREND_SPAN = {
+    "day": timedelta(days=30),
+    "week": timedelta(weeks=26),
+    "month": timedelta(days=365),
+}
+
+# ======================================================
+# DEPARTMENT SUMMARY (READS ROLLUPS — O(BUCKETS))
+# ======================================================
+def department_summary(db: Session, department_id: int, questionnaire_id: int = None):
+    def scoped(query, model):
+        query = query.join(Questionnaire, Questionnaire.id == model.questionnaire_id)
+        query = query.filter(Questionnaire.department_id == department_id)
+        if questionnaire_id is not None:
+            query = query.filter(model.questionnaire_id == questionnaire_id)
+        return query
+
+    # ---------- RESPONSE TOTALS + DATE RANGE ----------
+    dated = func.nullif(EvaluationDailyRollup.day, UNDATED, type_=Date)
+    responses, first_day, last_day = scoped(
+        db.query(
+            func.sum(EvaluationDailyRollup.responses),
+            func.min(dated),
+            func.max(dated),
+        ),
+        EvaluationDailyRollup
+    ).one()
+
+    # ---------- CLIENT CATEGORY BREAKDOWN ----------
+    categories = scoped(
+        db.query(
+            EvaluationDailyRollup.client_category,
+            func.sum(EvaluationDailyRollup.responses)
+        ).group_by(EvaluationDailyRollup.client_category),
+        EvaluationDailyRollup
+    ).all()
+
+    # ---------- PER-QUESTION STATS ----------
+    rollup = EvaluationQuestionRollup
+    rows = scoped(
+        db.query(
+            rollup.question_idx,
+            func.sum(rollup.count),
+            func.sum(rollup.total),
+            *[func.sum(getattr(rollup, f"star_{star}")) for star in STAR_VALUES],
+        )
+        .group_by(rollup.question_idx)
+        .order_by(rollup.question_idx),
+        rollup
+    ).all()
+
+    return build_summary(
+        responses,
+        first_day.isoformat() if first_day else None,
+        last_day.isoformat() if last_day else None,
+        categories,
+        [(row[0], row[1], row[2], row[3:]) for row in rows],
+    )
+
+
+def build_summary(responses, first_date, last_date, categories, questions):
+    """
+    Shapes aggregated rows into the summary payload.
+    `questions` holds (idx, count, total, [star_1..star_5]) tuples.
+    """
+    count = sum(q[1] or 0 for q in questions)
+    total = sum(q[2] or 0 for q in questions)
+
+    return {
+        "responses": int(responses or 0),
+        "average": round(total / count, 2) if count else None,
+        "first_date": first_date,
+        "last_date": last_date,
+        "client_categories": {
+            (category or "Unspecified"): int(n) for category, n in categories
+        },
+        "questions": [
+            {
+                "index": int(idx),
+                "count": int(n),
+                "mean": round((q_total or 0) / n, 2) if n else None,
+                "histogram": {
+                    str(star): int(bucket or 0)
+                    for star, bucket in zip(STAR_VALUES, buckets)
+                },
+            }
+            for idx, n, q_total, buckets in questions
+        ],
+    }
+
+
+# ======================================================
+# DEPARTMENT TREND (READS ROLLUPS — O(DAYS IN RANGE))
+# ======================================================
+# Rollup days are UTC days of submitted_at, so a trend is a range scan
+# of rollup rows between two days, grouped into periods by the database.
+def _period(dialect: str, bucket: str, day):
+    if dialect == "postgresql":
+        return cast(func.date_trunc(bucket, day), Date)
+    if bucket == "week":
+        # the Sunday on or after, minus six days: that week's Monday
+        return func.date(day, "weekday 0", "-6 days")
+    if bucket == "month":
+        return func.strftime("%Y-%m-01", day)
+    return day
+
+
+def _iso(value) -> str:
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def department_trend(
+    db: Session,
+    department_id: int,
+    bucket: str = "week",
+    start: date = None,
+    end: date = None,
+    questionnaire_id: int = None,
+):
+    """
+    Responses and per-question means per day, week (from Monday) or
+    month, for days start..end inclusive (default: TREND_SPAN up to today).
+    """
+    end = end or datetime.utcnow().date()
+    start = start or end - TREND_SPAN[bucket] + timedelta(days=1)
+    dialect = db.get_bind().dialect.name
+
+    def scoped(query, model):
+        query = query.join(Questionnaire, Questionnaire.id == model.questionnaire_id)
+        query = query.filter(
+            Questionnaire.department_id == department_id,
+            model.day >= start,
+            model.day <= end,
+            model.day != UNDATED
+        )
+        if questionnaire_id is not None:
+            query = query.filter(model.questionnaire_id == questionnaire_id)
+        return query
+
+    # ---------- RESPONSES PER PERIOD ----------
+    daily = EvaluationDailyRollup
+    period = _period(dialect, bucket, daily.day).label("period")
+    periods = {
+        _iso(key): {"period": _iso(key), "responses": int(n), "average": None, "questions": []}
+        for key, n in scoped(
+            db.query(period, func.sum(daily.responses)).group_by(period).order_by(period),
+            daily
+        )
+    }
+
+    # ---------- PER-QUESTION MEANS PER PERIOD ----------
+    rollup = EvaluationQuestionRollup
+    period = _period(dialect, bucket, rollup.day).label("period")
+    totals = {}
+    for key, idx, n, total in scoped(
+        db.query(period, rollup.question_idx, func.sum(rollup.count), func.sum(rollup.total))
+        .group_by(period, rollup.question_idx)
+        .order_by(period, rollup.question_idx),
+        rollup
+    ):
+        key = _iso(key)
+        n, total = int(n or 0), int(total or 0)
+        periods[key]["questions"].append({
+            "index": int(idx),
+            "count": n,
+            "mean": round(total / n, 2) if n else None,
+        })
+        count, running = totals.get(key, (0, 0))
+        totals[key] = (count + n, running + total)
+
+    for key, (count, total) in totals.items():
+        periods[key]["average"] = round(total / count, 2) if count else None
+
+    return {
+        "bucket": bucket,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "periods": list(periods.values()),
+    }
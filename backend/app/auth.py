@@ -1,15 +1,30 @@
-from passlib.context import CryptContext
-from datetime import datetime, timedelta
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import multiprocessing
 import jwt
 import os
+import time
+
+from .metrics import password_latency
 
 # ======================================================
 # PASSWORD HASHING (SAFE FOR WINDOWS + PYTHON 3.12)
 # ======================================================
-pwd_context = CryptContext(
-    schemes=["pbkdf2_sha256"],
-    deprecated="auto"
-)
+# Built on first use: importing passlib is kept off the cold-start path.
+_pwd_context = None
+
+
+def get_pwd_context():
+    global _pwd_context
+
+    if _pwd_context is None:
+        from passlib.context import CryptContext
+
+        _pwd_context = CryptContext(
+            schemes=["pbkdf2_sha256"],
+            deprecated="auto"
+        )
+    return _pwd_context
 
 # ======================================================
 # JWT CONFIG
@@ -19,12 +34,54 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_HOURS = 8
 
 def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+    return get_pwd_context().hash(password)
 
 def verify_password(plain: str, hashed: str) -> bool:
-    return pwd_context.verify(plain, hashed)
+    return get_pwd_context().verify(plain, hashed)
+
+# ======================================================
+# HASHING PROCESS POOL (KEEPS PBKDF2 OFF THE REQUEST THREADS)
+# ======================================================
+# One per core; app.serve divides the cores between its workers
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+_hash_pool = None
+
+
+def get_hash_pool() -> ProcessPoolExecutor:
+    global _hash_pool
+
+    if _hash_pool is None:
+        _hash_pool = ProcessPoolExecutor(
+            max_workers=PASSWORD_HASH_WORKERS,
+            mp_context=multiprocessing.get_context("spawn")
+        )
+    return _hash_pool
+
+
+def shutdown_hash_pool():
+    global _hash_pool
+
+    if _hash_pool is not None:
+        _hash_pool.shutdown(wait=False, cancel_futures=True)
+        _hash_pool = None
+
+
+async def hash_password_async(password: str) -> str:
+    loop = asyncio.get_running_loop()
+    with password_latency.time("hash"):
+        return await loop.run_in_executor(get_hash_pool(), hash_password, password)
+
+
+async def verify_password_async(plain: str, hashed: str) -> bool:
+    loop = asyncio.get_running_loop()
+    with password_latency.time("verify"):
+        return await loop.run_in_executor(get_hash_pool(), verify_password, plain, hashed)
 
 def create_token(data: dict) -> str:
     payload = data.copy()
-    payload["exp"] = datetime.utcnow() + timedelta(hours=ACCESS_TOKEN_EXPIRE_HOURS)
+    # fractional seconds, so revocation can tell a token issued just
+    # before a role change from one issued just after it
+    payload["iat"] = time.time()
+    payload["exp"] = payload["iat"] + ACCESS_TOKEN_EXPIRE_HOURS * 3600
     return jwt.encode(payload, SECRET_KEY, algorithm=ALGORITHM)
\ No newline at end of file
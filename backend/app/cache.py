@@ -0,0 +1,66 @@
+from collections import OrderedDict
+from threading import Lock
+import time
+
+MISSING = object()
+
+# ======================================================
+# BOUNDED LRU CACHE WITH OPTIONAL TTL (THREAD-SAFE)
+# ======================================================
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: float = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key, default=MISSING):
+        with self._lock:
+            entry = self._data.get(key)
+
+            if entry is not None:
+                value, expires_at = entry
+                if expires_at is None or expires_at > time.monotonic():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+
+            self.misses += 1
+            return default
+
+    def set(self, key, value, ttl: float = None):
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = time.monotonic() + ttl if ttl is not None else None
+
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def invalidate(self, key):
+        with self._lock:
+            self._data.pop(key, None)
+
+    def invalidate_where(self, predicate):
+        with self._lock:
+            for key in [k for k, (v, _) in self._data.items() if predicate(k, v)]:
+                del self._data[key]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "maxsize": self.maxsize,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def __len__(self):
+        return len(self._data)
@@ -1,7 +1,12 @@
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker
 from sqlalchemy.orm import sessionmaker, declarative_base
 import os
 
+from .dbpool import InstrumentedAsyncQueuePool, InstrumentedQueuePool
+
 # ======================================================
 # DATABASE CONFIG (POSTGRES FOR RENDER)
 # ======================================================
@@ -17,6 +22,57 @@ if not DATABASE_URL:
 if DATABASE_URL.startswith("postgres://"):
     DATABASE_URL = DATABASE_URL.replace("postgres://", "postgresql://", 1)
 
+# ======================================================
+# POOL + SQLITE TUNING (ENV)
+# ======================================================
+# Applies to each engine (sync and async) separately, so one process can
+# hold up to 2 x (DB_POOL_SIZE + DB_MAX_OVERFLOW) connections. app.serve
+# lowers the defaults per worker (DB_MAX_CONNECTIONS across all workers).
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+
+SQLITE_JOURNAL_MODE = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+
+def _pool_options(url, poolclass) -> dict:
+    url = make_url(url)
+
+    # in-memory SQLite is one connection per thread / a static pool
+    if url.get_backend_name() == "sqlite" and url.database in (None, "", ":memory:"):
+        return {}
+
+    return {
+        "poolclass": poolclass,
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_timeout": DB_POOL_TIMEOUT,
+    }
+
+
+def _sqlite_profile(dbapi_connection, connection_record):
+    """
+    WAL lets readers run alongside the single writer, NORMAL skips an
+    fsync per commit (still safe in WAL), busy_timeout waits for a lock
+    instead of failing with "database is locked".
+    """
+    cursor = dbapi_connection.cursor()
+    cursor.execute(f"PRAGMA journal_mode={SQLITE_JOURNAL_MODE}")
+    cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+    cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+    cursor.close()
+
+
+def _configure(sync_engine):
+    if sync_engine.dialect.name == "sqlite":
+        event.listen(sync_engine, "connect", _sqlite_profile)
+
 # ======================================================
 # ENGINE
 # ======================================================
@@ -24,7 +80,9 @@ if DATABASE_URL.startswith("postgres://"):
 engine = create_engine(
     DATABASE_URL,
     pool_pre_ping=True,
+    **_pool_options(DATABASE_URL, InstrumentedQueuePool)
 )
+_configure(engine)
 
 # ======================================================
 # SESSION
@@ -36,8 +94,57 @@ SessionLocal = sessionmaker(
     bind=engine
 )
 
+# ======================================================
+# ASYNC ENGINE + SESSION (REQUEST HANDLERS)
+# ======================================================
+# Same database through an asyncio driver. The sync engine stays for
+# migrations, CLIs, streaming exports and the ingest writer thread.
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def async_database_url(url):
+    url = make_url(url)
+    backend = url.get_backend_name()
+    url = url.set(drivername=ASYNC_DRIVERS.get(backend, url.drivername))
+
+    # asyncpg takes `ssl`, not libpq's `sslmode` (Render URLs carry it)
+    if backend == "postgresql" and "sslmode" in url.query:
+        url = url.update_query_dict({"ssl": url.query["sslmode"]})
+        url = url.difference_update_query(["sslmode"])
+
+    return url
+
+
+async_engine = create_async_engine(
+    async_database_url(DATABASE_URL),
+    pool_pre_ping=True,
+    **_pool_options(DATABASE_URL, InstrumentedAsyncQueuePool)
+)
+_configure(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False
+)
+
 # ======================================================
 # BASE
 # ======================================================
 
 Base = declarative_base()
+
+
+# ======================================================
+# DIALECT HELPERS
+# ======================================================
+def dialect_insert(db):
+    """
+    INSERT construct with ON CONFLICT support for the session's backend.
+    """
+    if db.get_bind().dialect.name == "postgresql":
+        return postgresql.insert
+    return sqlite.insert
@@ -0,0 +1,106 @@
+from threading import Lock
+from time import perf_counter
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+from .metrics import pool_checkout_latency
+
+# ======================================================
+# CHECKOUT STATISTICS
+# ======================================================
+class PoolStats:
+    """
+    Counters for connection checkouts. `waits` counts checkouts that
+    found the pool exhausted (no idle connection, overflow used up) and
+    had to queue; `timeouts` the ones that gave up after pool_timeout.
+    """
+
+    def __init__(self):
+        self._lock = Lock()
+        self.checkouts = 0
+        self.waits = 0
+        self.timeouts = 0
+        self.checkout_seconds = 0.0
+        self.max_checkout_seconds = 0.0
+
+    def record(self, elapsed: float, waited: bool):
+        with self._lock:
+            self.checkouts += 1
+            self.waits += waited
+            self.checkout_seconds += elapsed
+            self.max_checkout_seconds = max(self.max_checkout_seconds, elapsed)
+
+    def as_dict(self) -> dict:
+        with self._lock:
+            return {
+                "checkouts": self.checkouts,
+                "waits": self.waits,
+                "timeouts": self.timeouts,
+                "avg_checkout_ms": round(self.checkout_seconds / self.checkouts * 1000, 3) if self.checkouts else 0.0,
+                "max_checkout_ms": round(self.max_checkout_seconds * 1000, 3),
+            }
+
+# ======================================================
+# INSTRUMENTED POOLS
+# ======================================================
+class _InstrumentedPool:
+    """
+    Times every checkout (`_do_get`), including queueing for a free
+    connection and opening a new one.
+    """
+    engine_label = ""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.stats = PoolStats()
+
+    def recreate(self):
+        # dispose()/invalidation swap in a fresh pool; keep the counters
+        pool = super().recreate()
+        pool.stats = self.stats
+        return pool
+
+    def _do_get(self):
+        exhausted = (
+            self._max_overflow > -1
+            and self.checkedin() == 0
+            and self.overflow() >= self._max_overflow
+        )
+        started = perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self.stats._lock:
+                self.stats.timeouts += 1
+            raise
+        finally:
+            elapsed = perf_counter() - started
+            self.stats.record(elapsed, exhausted)
+            pool_checkout_latency.observe(self.engine_label, value=elapsed)
+
+
+class InstrumentedQueuePool(_InstrumentedPool, QueuePool):
+    engine_label = "sync"
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPool, AsyncAdaptedQueuePool):
+    engine_label = "async"
+
+
+def pool_status(engine) -> dict:
+    pool = engine.pool
+    status = {"class": type(pool).__name__}
+
+    if isinstance(pool, QueuePool):
+        status.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            max_overflow=pool._max_overflow,
+        )
+    if isinstance(pool, _InstrumentedPool):
+        status.update(pool.stats.as_dict())
+
+    return status
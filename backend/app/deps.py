@@ -2,23 +2,64 @@ from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 import jwt
 import os
+import time
+
+from .cache import LRUCache, MISSING
+from .invalidation import invalidation_bus
 
 # ======================================================
 # JWT CONFIG (MUST MATCH auth.py)
 # ======================================================
 SECRET_KEY = os.getenv("SECRET_KEY", "dev-secret")
 ALGORITHM = "HS256"
+ACCESS_TOKEN_EXPIRE_HOURS = 8
 
 security = HTTPBearer()
 
-# ===============================
-# CORE AUTH
-# ===============================
-def get_current_user(
-    credentials: HTTPAuthorizationCredentials = Depends(security)
-):
-    token = credentials.credentials
+# ======================================================
+# VERIFIED TOKEN CACHE
+# ======================================================
+# token -> decoded payload, each entry expiring with the token's `exp`
+TOKEN_CACHE_SIZE = int(os.getenv("TOKEN_CACHE_SIZE", "4096"))
+token_cache = LRUCache(maxsize=TOKEN_CACHE_SIZE)
+
+# user id -> tokens issued (iat, fractional seconds) at or before this
+# time are rejected
+_revoked_before = {}
+
+
+def revoke_user_tokens(user_id: int):
+    """
+    Call after changing a user's role/department or deleting them:
+    their outstanding tokens still carry the old claims.
+    """
+    now = time.time()
+    _revoke(user_id, now)
+    invalidation_bus.publish("token_revocation", {"user_id": user_id, "before": now})
+
+
+def _revoke(user_id: int, before: float):
+    horizon = before - ACCESS_TOKEN_EXPIRE_HOURS * 3600
+
+    for uid in [uid for uid, ts in list(_revoked_before.items()) if ts < horizon]:
+        _revoked_before.pop(uid, None)
+
+    _revoked_before[user_id] = max(before, _revoked_before.get(user_id, 0))
+    token_cache.invalidate_where(lambda token, payload: payload["id"] == user_id)
+
 
+invalidation_bus.subscribe(
+    "token_revocation",
+    lambda payload: _revoke(payload["user_id"], payload["before"])
+)
+
+
+def _is_revoked(payload: dict) -> bool:
+    revoked_before = _revoked_before.get(payload["id"])
+    return revoked_before is not None and payload.get("iat", 0) <= revoked_before
+
+
+def _decode(token: str) -> dict:
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
 
@@ -43,13 +84,39 @@ def get_current_user(
             detail="Invalid token"
         )
 
+# ===============================
+# CORE AUTH
+# ===============================
+def authenticate(token: str) -> dict:
+    # HOT PATH: ALREADY VERIFIED AND NOT YET EXPIRED
+    payload = token_cache.get(token)
+    if payload is MISSING:
+        payload = _decode(token)
+        ttl = payload["exp"] - time.time() if "exp" in payload else None
+        token_cache.set(token, payload, ttl=ttl)
+
+    if _is_revoked(payload):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token revoked"
+        )
+
+    return payload
+
+
+# async so FastAPI resolves it on the event loop, not a threadpool slot
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security)
+):
+    return authenticate(credentials.credentials)
+
 
 # ===============================
 # ROLE GUARDS
 # ===============================
 
 # ADMIN ONLY
-def require_admin(user=Depends(get_current_user)):
+async def require_admin(user=Depends(get_current_user)):
     if user["role"] != "admin":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -59,7 +126,7 @@ def require_admin(user=Depends(get_current_user)):
 
 
 # HR ONLY
-def require_hr(user=Depends(get_current_user)):
+async def require_hr(user=Depends(get_current_user)):
     if user["role"] != "hr":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -69,7 +136,7 @@ def require_hr(user=Depends(get_current_user)):
 
 
 # HEAD ONLY
-def require_head(user=Depends(get_current_user)):
+async def require_head(user=Depends(get_current_user)):
     if user["role"] != "head":
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -83,7 +150,7 @@ def require_head(user=Depends(get_current_user)):
 # ===============================
 
 # ADMIN OR HR
-def require_hr_or_admin(user=Depends(get_current_user)):
+async def require_hr_or_admin(user=Depends(get_current_user)):
     if user["role"] not in ["hr", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -93,7 +160,7 @@ def require_hr_or_admin(user=Depends(get_current_user)):
 
 
 # ADMIN OR HEAD
-def require_head_or_admin(user=Depends(get_current_user)):
+async def require_head_or_admin(user=Depends(get_current_user)):
     if user["role"] not in ["head", "admin"]:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
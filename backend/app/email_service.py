@@ -1,16 +1,307 @@
-import smtplib
 from email.message import EmailMessage
+from email.utils import parseaddr
+from urllib.parse import urlsplit
+from threading import Lock, Thread
+import logging
+import os
+import queue
+import smtplib
+import time
+import uuid
 
-SMTP_EMAIL = "greggarrido574@gmail.com"
-SMTP_PASSWORD = "oxwy vyqo mmfq vera"
+from .cache import LRUCache, MISSING
 
-def send_email(to_email: str, subject: str, body: str):
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# SMTP CONFIG
+# ======================================================
+SMTP_HOST = os.getenv("SMTP_HOST", "smtp.gmail.com")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "465"))
+SMTP_SECURITY = os.getenv("SMTP_SECURITY", "ssl")  # ssl | starttls | none
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+# no defaults: without SMTP_EMAIL, invitations are refused (503)
+SMTP_EMAIL = os.getenv("SMTP_EMAIL", "")
+SMTP_PASSWORD = os.getenv("SMTP_PASSWORD", "")
+
+# ======================================================
+# DISPATCH CONFIG
+# ======================================================
+EMAIL_BATCH_SIZE = int(os.getenv("EMAIL_BATCH_SIZE", "50"))
+EMAIL_RATE_PER_SEC = float(os.getenv("EMAIL_RATE_PER_SEC", "5"))
+EMAIL_MAX_RETRIES = int(os.getenv("EMAIL_MAX_RETRIES", "3"))
+EMAIL_RETRY_BACKOFF = float(os.getenv("EMAIL_RETRY_BACKOFF", "2"))
+EMAIL_MAX_QUEUE = int(os.getenv("EMAIL_MAX_QUEUE", "10000"))
+INVITATION_MAX_RECIPIENTS = int(os.getenv("INVITATION_MAX_RECIPIENTS", "1000"))
+
+INVITATION_SUBJECT = "You're invited to evaluate our service"
+
+
+class EmailQueueFull(Exception):
+    pass
+
+
+def email_configured() -> bool:
+    return bool(SMTP_EMAIL)
+
+
+def valid_address(address: str) -> bool:
+    """
+    A bare address (no display name), no CR/LF header injection.
+    """
+    if "\r" in address or "\n" in address:
+        return False
+    name, parsed = parseaddr(address)
+    local, _, domain = parsed.rpartition("@")
+    return (
+        not name
+        and parsed == address
+        and bool(local)
+        and "." in domain.strip(".")
+        and not any(ch.isspace() for ch in parsed)
+    )
+
+
+def valid_link(link: str, origins) -> bool:
+    """
+    Invitation links may only point at the app's own origins, so the
+    sender address cannot be used to mail arbitrary (phishing) links.
+    """
+    parts = urlsplit(link)
+    return (
+        parts.scheme in ("http", "https")
+        and not parts.username
+        and not parts.password
+        and f"{parts.scheme}://{parts.netloc}".lower() in {o.lower().rstrip("/") for o in origins}
+    )
+
+
+def connect() -> smtplib.SMTP:
+    """
+    One connected, authenticated SMTP session (TLS handshake + login).
+    """
+    if SMTP_SECURITY == "ssl":
+        smtp = smtplib.SMTP_SSL(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+    else:
+        smtp = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+        if SMTP_SECURITY == "starttls":
+            smtp.starttls()
+
+    if SMTP_PASSWORD:
+        smtp.login(SMTP_EMAIL, SMTP_PASSWORD)
+    return smtp
+
+
+def build_message(to_email: str, subject: str, body: str) -> EmailMessage:
     msg = EmailMessage()
     msg["From"] = SMTP_EMAIL
     msg["To"] = to_email
     msg["Subject"] = subject
     msg.set_content(body)
+    return msg
 
-    with smtplib.SMTP_SSL("smtp.gmail.com", 465) as smtp:
-        smtp.login(SMTP_EMAIL, SMTP_PASSWORD)
-        smtp.send_message(msg)
+
+def invitation_message(to_email: str, link: str) -> EmailMessage:
+    return build_message(
+        to_email,
+        INVITATION_SUBJECT,
+        "Hello,\n\n"
+        "Please take a minute to rate the service you received:\n\n"
+        f"{link}\n\n"
+        "Thank you!"
+    )
+
+
+def send_email(to_email: str, subject: str, body: str):
+    with connect() as smtp:
+        smtp.send_message(build_message(to_email, subject, body))
+
+# ======================================================
+# JOB STATUS
+# ======================================================
+# job id -> {"id", "total", "sent", "failed", "errors"}; in-process only,
+# so with several workers only the one that queued a job can report it
+jobs = LRUCache(maxsize=1024)
+_jobs_lock = Lock()
+
+
+def _new_job(total: int) -> dict:
+    job = {"id": uuid.uuid4().hex, "total": total, "sent": 0, "failed": 0, "errors": []}
+    jobs.set(job["id"], job)
+    return job
+
+
+def _record(job_id: str, recipient: str, error=None):
+    job = jobs.get(job_id)
+    if job is MISSING:
+        return
+    with _jobs_lock:
+        if error is None:
+            job["sent"] += 1
+        else:
+            job["failed"] += 1
+            if len(job["errors"]) < 50:
+                job["errors"].append({"to": recipient, "error": str(error)})
+
+
+def job_status(job_id: str):
+    job = jobs.get(job_id)
+    if job is MISSING:
+        return None
+    with _jobs_lock:
+        return {**job, "errors": list(job["errors"]), "pending": job["total"] - job["sent"] - job["failed"]}
+
+# ======================================================
+# BACKGROUND SENDER
+# ======================================================
+def _is_transient(exc: Exception) -> bool:
+    """
+    Dropped connections and 4xx replies are worth retrying; 5xx
+    (bad address, rejected message) are not.
+    """
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(400 <= code < 500 for code, _ in exc.recipients.values())
+    if isinstance(exc, smtplib.SMTPResponseException):
+        return 400 <= exc.smtp_code < 500
+    return _connection_lost(exc)
+
+
+def _connection_lost(exc: Exception) -> bool:
+    # SMTPException subclasses OSError: other replies keep the connection
+    if isinstance(exc, smtplib.SMTPServerDisconnected):
+        return True
+    if isinstance(exc, smtplib.SMTPException):
+        return getattr(exc, "smtp_code", None) == 421
+    return isinstance(exc, OSError)
+
+
+class EmailDispatcher:
+    """
+    Sends queued messages from one thread. Each batch (up to
+    EMAIL_BATCH_SIZE queued messages) shares one authenticated SMTP
+    connection; sends are paced to EMAIL_RATE_PER_SEC, and transient
+    failures reconnect and retry with exponential backoff.
+    """
+
+    def __init__(self, batch_size=EMAIL_BATCH_SIZE, rate=EMAIL_RATE_PER_SEC, max_queue=EMAIL_MAX_QUEUE):
+        self.batch_size = batch_size
+        self.interval = 1 / rate if rate > 0 else 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+        self._start_lock = Lock()
+        self._next_send = 0.0
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def start(self):
+        # also restarts a sender thread that died
+        with self._start_lock:
+            if self.running:
+                return
+            self._thread = Thread(target=self._run, name="email-dispatcher", daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: float = 10):
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join(timeout)
+        self._thread = None
+
+    def enqueue_invitations(self, recipients, link: str) -> dict:
+        if self._queue.qsize() + len(recipients) > self._queue.maxsize:
+            raise EmailQueueFull()
+
+        self.start()
+        job = _new_job(len(recipients))
+        for to_email in recipients:
+            self._queue.put_nowait((job["id"], to_email, link))
+        return job
+
+    # ---------- SENDER THREAD ----------
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            stopping = False
+            while len(batch) < self.batch_size:
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            try:
+                self._send_batch(batch)
+            except Exception:
+                # keep the sender alive for the jobs queued behind this batch
+                logger.exception("Email batch of %d failed", len(batch))
+            if stopping:
+                return
+
+    def _pace(self):
+        now = time.monotonic()
+        if self._next_send > now:
+            time.sleep(self._next_send - now)
+        self._next_send = max(now, self._next_send) + self.interval
+
+    def _send_batch(self, batch):
+        smtp = None
+        try:
+            for job_id, to_email, link in batch:
+                try:
+                    msg = invitation_message(to_email, link)
+                except (ValueError, TypeError) as exc:
+                    # e.g. a header value with CR/LF
+                    logger.warning("Email to %r not built: %s", to_email, exc)
+                    _record(job_id, to_email, exc)
+                    continue
+
+                for attempt in range(EMAIL_MAX_RETRIES + 1):
+                    try:
+                        if smtp is None:
+                            smtp = connect()
+                        self._pace()
+                        smtp.send_message(msg)
+                        _record(job_id, to_email)
+                        break
+                    except (smtplib.SMTPException, OSError) as exc:
+                        if not _is_transient(exc) or attempt == EMAIL_MAX_RETRIES:
+                            logger.warning("Email to %s failed: %s", to_email, exc)
+                            _record(job_id, to_email, exc)
+                            break
+
+                        if _connection_lost(exc):
+                            smtp = _close(smtp)
+                        else:
+                            _reset(smtp)
+                        time.sleep(EMAIL_RETRY_BACKOFF * 2 ** attempt)
+        finally:
+            _close(smtp)
+
+
+def _reset(smtp):
+    try:
+        smtp.rset()
+    except (smtplib.SMTPException, OSError):
+        pass
+
+
+def _close(smtp):
+    if smtp is not None:
+        try:
+            smtp.quit()
+        except (smtplib.SMTPException, OSError):
+            smtp.close()
+    return None
+
+
+email_dispatcher = EmailDispatcher()
@@ -0,0 +1,91 @@
+import csv
+import io
+
+from sqlalchemy import select
+import orjson
+
+from .database import SessionLocal
+from .models import EvaluationResponse, Questionnaire
+
+EXPORT_BATCH_SIZE = 1000
+
+EXPORT_COLUMNS = (
+    EvaluationResponse.id,
+    EvaluationResponse.questionnaire_id,
+    EvaluationResponse.name,
+    EvaluationResponse.date,
+    EvaluationResponse.time,
+    EvaluationResponse.client_category,
+    EvaluationResponse.ratings,
+    EvaluationResponse.feedback_type,
+    EvaluationResponse.feedback_message,
+    EvaluationResponse.submitted_at,
+)
+
+EXPORT_FIELDS = [column.key for column in EXPORT_COLUMNS]
+RATINGS_FIELD = EXPORT_FIELDS.index("ratings")
+SUBMITTED_AT_FIELD = EXPORT_FIELDS.index("submitted_at")
+
+EXPORT_MEDIA_TYPES = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+# ======================================================
+# SERVER-SIDE CURSOR
+# ======================================================
+def _department_rows(department_id: int):
+    """
+    Streams the department's responses in id order with a server-side
+    cursor, holding at most one batch in memory. Owns its session because
+    it outlives the request's dependency scope.
+    """
+    db = SessionLocal()
+    try:
+        stmt = (
+            select(*EXPORT_COLUMNS)
+            .join(Questionnaire, Questionnaire.id == EvaluationResponse.questionnaire_id)
+            .where(Questionnaire.department_id == department_id)
+            .order_by(EvaluationResponse.id)
+            .execution_options(yield_per=EXPORT_BATCH_SIZE)
+        )
+        for partition in db.execute(stmt).partitions():
+            yield partition
+    finally:
+        db.close()
+
+# ======================================================
+# ENCODERS (ONE CHUNK PER BATCH)
+# ======================================================
+def _ndjson(department_id: int):
+    for rows in _department_rows(department_id):
+        yield b"".join(
+            orjson.dumps(dict(zip(EXPORT_FIELDS, row)), option=orjson.OPT_APPEND_NEWLINE)
+            for row in rows
+        )
+
+
+def _csv(department_id: int):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    writer.writerow(EXPORT_FIELDS)
+    yield buffer.getvalue()
+
+    for rows in _department_rows(department_id):
+        buffer.seek(0)
+        buffer.truncate()
+        for row in rows:
+            row = list(row)
+            row[RATINGS_FIELD] = orjson.dumps(row[RATINGS_FIELD]).decode()
+            if row[SUBMITTED_AT_FIELD] is not None:
+                # ISO 8601, as in the NDJSON export and the API
+                row[SUBMITTED_AT_FIELD] = row[SUBMITTED_AT_FIELD].isoformat()
+            writer.writerow(row)
+        yield buffer.getvalue()
+
+
+def export_department(department_id: int, fmt: str):
+    if fmt == "csv":
+        return _csv(department_id)
+    return _ndjson(department_id)
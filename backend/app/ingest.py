@@ -0,0 +1,261 @@
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from datetime import datetime
+from threading import Thread
+import asyncio
+import logging
+import os
+import queue
+import time
+
+from sqlalchemy import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import Session
+
+from .database import SessionLocal, dialect_insert
+from .models import Questionnaire, EvaluationResponse, EvaluationScore, EvaluationSubmissionKey
+from .rollups import apply_rollup_rows
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+INGEST_BUFFERED = os.getenv("INGEST_BUFFERED", "0") == "1"
+INGEST_WINDOW_MS = float(os.getenv("INGEST_WINDOW_MS", "5"))
+INGEST_MAX_BATCH = int(os.getenv("INGEST_MAX_BATCH", "500"))
+INGEST_MAX_QUEUE = int(os.getenv("INGEST_MAX_QUEUE", "10000"))
+INGEST_TIMEOUT = float(os.getenv("INGEST_TIMEOUT", "10"))
+BATCH_MAX_ITEMS = int(os.getenv("BATCH_MAX_ITEMS", "500"))
+
+CREATED = "created"
+INACTIVE = "inactive"
+DUPLICATE = "duplicate"
+INVALID = "invalid"
+FAILED = "failed"
+
+
+class IngestQueueFull(Exception):
+    pass
+
+
+class IngestTimeout(Exception):
+    """
+    The writer did not finish within INGEST_TIMEOUT. The submission stays
+    queued and may still be committed.
+    """
+
+# ======================================================
+# BULK WRITE (CALLER COMMITS)
+# ======================================================
+def _claim_keys(db: Session, claims):
+    """
+    Records idempotency keys, skipping ones already stored, and returns
+    the keys this transaction won. Concurrent replays of the same key
+    cannot both succeed.
+    """
+    if not claims:
+        return set()
+
+    upsert = dialect_insert(db)
+    stmt = (
+        upsert(EvaluationSubmissionKey)
+        .values([{"key": key, "questionnaire_id": qid} for key, qid in claims])
+        .on_conflict_do_nothing(index_elements=["key"])
+        .returning(EvaluationSubmissionKey.key)
+    )
+    return {key for (key,) in db.execute(stmt)}
+
+
+def write_submissions(db: Session, items, keys=None):
+    """
+    items: list of (questionnaire_id, submission dict).
+    keys: optional idempotency key per item.
+
+    Resolves every referenced questionnaire with one query, writes the
+    accepted rows with a single multi-row INSERT (plus one for their
+    per-question scores) and updates the rollups in the same
+    transaction. Returns CREATED / INACTIVE / DUPLICATE per item.
+    """
+    qids = {qid for qid, _ in items}
+    active = {
+        qid for (qid,) in db.query(Questionnaire.id).filter(
+            Questionnaire.id.in_(qids),
+            Questionnaire.is_active == True
+        )
+    }
+
+    status = [CREATED if qid in active else INACTIVE for qid, _ in items]
+
+    if keys is not None:
+        claims = {}
+        for i, (key, (qid, _)) in enumerate(zip(keys, items)):
+            if status[i] != CREATED:
+                continue
+            if key in claims:
+                status[i] = DUPLICATE
+            else:
+                claims[key] = qid
+
+        claimed = _claim_keys(db, list(claims.items()))
+        for i, key in enumerate(keys):
+            if status[i] == CREATED and key not in claimed:
+                status[i] = DUPLICATE
+
+    submitted_at = datetime.utcnow()
+    rows = [
+        {"questionnaire_id": qid, **data, "submitted_at": submitted_at}
+        for (qid, data), result in zip(items, status)
+        if result == CREATED
+    ]
+
+    if rows:
+        ids = db.execute(
+            insert(EvaluationResponse).returning(EvaluationResponse.id, sort_by_parameter_order=True),
+            rows
+        ).scalars().all()
+
+        scores = [
+            {"response_id": response_id, "questionnaire_id": row["questionnaire_id"], "question_idx": idx, "score": score}
+            for response_id, row in zip(ids, rows)
+            for idx, score in enumerate(row["ratings"])
+        ]
+        if scores:
+            db.execute(insert(EvaluationScore), scores)
+
+        apply_rollup_rows(
+            db,
+            ((r["questionnaire_id"], r["submitted_at"], r["client_category"], r["ratings"]) for r in rows)
+        )
+
+    return status
+
+
+def commit_submissions(db: Session, items, keys=None):
+    """
+    write_submissions + commit. When the database rejects the batch
+    (a bad row), rolls back and writes item by item, each in its own
+    transaction, so one submission cannot sink the others; the rejected
+    ones come back FAILED.
+    """
+    try:
+        results = write_submissions(db, items, keys)
+        db.commit()
+        return results
+    except (DataError, IntegrityError):
+        db.rollback()
+        if len(items) == 1:
+            logger.exception("Submission rejected by the database")
+            return [FAILED]
+
+    results = []
+    for i, item in enumerate(items):
+        try:
+            results.extend(write_submissions(db, [item], None if keys is None else [keys[i]]))
+            db.commit()
+        except (DataError, IntegrityError):
+            db.rollback()
+            logger.exception("Submission %d of %d rejected by the database", i + 1, len(items))
+            results.append(FAILED)
+    return results
+
+# ======================================================
+# GROUP-COMMIT BUFFER
+# ======================================================
+class SubmissionBuffer:
+    """
+    Collects submissions for up to INGEST_WINDOW_MS (or INGEST_MAX_BATCH
+    items) and writes them with one INSERT and one COMMIT. Callers block
+    until their row is durable; a full queue fails fast.
+    """
+
+    def __init__(self, window_ms=INGEST_WINDOW_MS, max_batch=INGEST_MAX_BATCH, max_queue=INGEST_MAX_QUEUE):
+        self.window = window_ms / 1000
+        self.max_batch = max_batch
+        self._queue = queue.Queue(maxsize=max_queue)
+        self._thread = None
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def start(self):
+        if self._thread:
+            return
+        self._thread = Thread(target=self._run, name="ingest-buffer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if not self._thread:
+            return
+        self._queue.put(None)
+        self._thread.join()
+        self._thread = None
+
+    def enqueue(self, qid: int, data: dict) -> Future:
+        future = Future()
+        try:
+            self._queue.put_nowait((qid, data, future))
+        except queue.Full:
+            raise IngestQueueFull()
+        return future
+
+    def submit(self, qid: int, data: dict) -> str:
+        try:
+            return self.enqueue(qid, data).result(timeout=INGEST_TIMEOUT)
+        except FutureTimeout:
+            raise IngestTimeout()
+
+    async def submit_async(self, qid: int, data: dict) -> str:
+        # shield: a timed-out caller must not cancel the writer's future
+        future = asyncio.wrap_future(self.enqueue(qid, data))
+        try:
+            return await asyncio.wait_for(asyncio.shield(future), INGEST_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise IngestTimeout()
+
+    # ---------- WRITER THREAD ----------
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            if first is None:
+                return
+
+            batch = [first]
+            deadline = time.monotonic() + self.window
+            stopping = False
+
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=remaining)
+                except queue.Empty:
+                    break
+                if item is None:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._flush(batch)
+            if stopping:
+                return
+
+    def _flush(self, batch):
+        db = SessionLocal()
+        try:
+            results = commit_submissions(db, [(qid, data) for qid, data, _ in batch])
+        except Exception as exc:
+            db.rollback()
+            logger.exception("Group commit of %d submissions failed", len(batch))
+            for _, _, future in batch:
+                future.set_exception(exc)
+            return
+        finally:
+            db.close()
+
+        for (_, _, future), result in zip(batch, results):
+            future.set_result(result)
+
+
+submission_buffer = SubmissionBuffer()
@@ -0,0 +1,137 @@
+"""
+Cross-worker cache invalidation over UNIX datagram sockets.
+
+Every worker binds `<INVALIDATION_BUS_DIR>/<pid>.sock` and publishes by
+sending one datagram to every other socket in the directory, so a write
+handled by one worker drops the matching cache entries in all of them
+within a millisecond or two. Sockets left behind by dead workers are
+unlinked on the first failed send.
+
+With no directory configured (single process, tests, platforms without
+AF_UNIX) publish() is a no-op: the caller has already updated its own
+caches and there is nobody else to tell.
+"""
+from threading import Lock, Thread
+import json
+import logging
+import os
+import socket
+
+from .metrics import invalidation_messages
+
+logger = logging.getLogger(__name__)
+
+# python -m app.serve sets this for its workers
+INVALIDATION_BUS_DIR = os.getenv("INVALIDATION_BUS_DIR")
+
+MAX_DATAGRAM = 64 * 1024
+
+
+class InvalidationBus:
+    def __init__(self):
+        self._handlers = {}
+        self._sock = None
+        self._path = None
+        self._thread = None
+        self._send_lock = Lock()
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None
+
+    def subscribe(self, channel: str, handler):
+        """
+        handler(payload) runs on the bus thread for messages published by
+        other workers; it must be thread-safe (LRUCache is).
+        """
+        self._handlers.setdefault(channel, []).append(handler)
+
+    def start(self, directory: str = INVALIDATION_BUS_DIR):
+        if self._thread or not directory:
+            return
+
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, f"{os.getpid()}.sock")
+        if os.path.exists(path):
+            os.unlink(path)
+
+        try:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_DGRAM)
+            sock.bind(path)
+        except (AttributeError, OSError) as exc:
+            # e.g. Windows: no AF_UNIX datagrams; caches fall back to their TTLs
+            logger.warning("Invalidation bus disabled: %s", exc)
+            return
+
+        self._sock, self._path = sock, path
+        self._thread = Thread(target=self._run, name="invalidation-bus", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 2):
+        if not self._thread:
+            return
+
+        # wake the blocking recv() with an empty datagram to ourselves
+        try:
+            self._sock.sendto(b"", self._path)
+        except OSError:
+            pass
+        self._thread.join(timeout)
+        self._thread = None
+
+        self._sock.close()
+        self._sock = None
+        try:
+            os.unlink(self._path)
+        except FileNotFoundError:
+            pass
+
+    # ---------- PUBLISH ----------
+    def publish(self, channel: str, payload=None):
+        if not self._thread:
+            return
+
+        data = json.dumps({"channel": channel, "payload": payload}).encode("utf-8")
+        directory = os.path.dirname(self._path)
+
+        with self._send_lock:
+            for entry in os.scandir(directory):
+                if not entry.name.endswith(".sock") or entry.path == self._path:
+                    continue
+                try:
+                    self._sock.sendto(data, entry.path)
+                    invalidation_messages.inc(channel, "sent")
+                except (ConnectionRefusedError, FileNotFoundError):
+                    # worker is gone; nothing is listening on that path
+                    try:
+                        os.unlink(entry.path)
+                    except FileNotFoundError:
+                        pass
+                except OSError as exc:
+                    # full receive buffer etc.; the cache TTLs still bound staleness
+                    invalidation_messages.inc(channel, "dropped")
+                    logger.warning("Invalidation to %s failed: %s", entry.name, exc)
+
+    # ---------- RECEIVER THREAD ----------
+    def _run(self):
+        while True:
+            data = self._sock.recv(MAX_DATAGRAM)
+            if not data:
+                return
+
+            try:
+                message = json.loads(data)
+                channel = message["channel"]
+            except (ValueError, KeyError, TypeError):
+                logger.warning("Ignoring malformed invalidation message")
+                continue
+
+            invalidation_messages.inc(channel, "received")
+            for handler in self._handlers.get(channel, ()):
+                try:
+                    handler(message.get("payload"))
+                except Exception:
+                    logger.exception("Invalidation handler for %s failed", channel)
+
+
+invalidation_bus = InvalidationBus()
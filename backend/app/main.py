@@ -1,35 +1,108 @@
 from dotenv import load_dotenv
 load_dotenv()
 
-from fastapi import FastAPI, Depends, HTTPException
-from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-import os
+from . import startup  # COLD-START CLOCK STARTS HERE
 
-from .database import SessionLocal, engine
-from .models import Base, User, Department, Questionnaire, EvaluationResponse
+from fastapi import FastAPI, Depends, HTTPException, Query, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import func, and_, select, text, update
+from typing import List, Optional
+from datetime import date, datetime
+from time import perf_counter
+
+from .database import SessionLocal, AsyncSessionLocal, engine, async_engine
+from .models import User, Department, Questionnaire, EvaluationResponse, EvaluationScore
+from .migrations import upgrade
+from .seed import seed_default_users
+from .dbpool import pool_status
+from .metrics import MetricsMiddleware, register_collector, render as render_metrics
 from .schemas import (
     LoginSchema,
     DepartmentCreate,
     QuestionnaireCreate,
     EvaluationSubmitSchema,
+    BatchEvaluationItem,
+    BatchEvaluationSubmitSchema,
     ChatSchema,
+    BulkInvitationSchema,
     UpdateUserSchema,
-    AssignHeadSchema
+    AssignHeadSchema,
+    UserOut,
+    QuestionnaireOut,
+    EvaluationOut,
+    EvaluationPage,
+    EvaluationSearchPage
+)
+from .responses import ORJSONResponse, columns
+from .auth import (
+    create_token,
+    hash_password_async,
+    verify_password_async,
+    shutdown_hash_pool
+)
+from .deps import get_current_user, revoke_user_tokens
+from .ai import router as ai_router, ask_ai, sse_reply, close_groq_client
+from .analytics import department_summary, department_trend
+from .summaries import SummaryFailed, summarize_feedback
+from .search import search_query
+from .rollups import apply_rollups
+from .exports import export_department, EXPORT_MEDIA_TYPES
+from .active_questionnaire import lookup_active, invalidate_active
+from .invalidation import invalidation_bus
+from .querystats import QueryStatsMiddleware, install_query_stats, query_budget
+from .ratelimit import RATE_LIMIT_ENABLED, RateLimitMiddleware
+from .email_service import (
+    INVITATION_MAX_RECIPIENTS,
+    EmailQueueFull,
+    email_configured,
+    email_dispatcher,
+    job_status,
+    valid_address,
+    valid_link
+)
+from .ingest import (
+    INGEST_BUFFERED,
+    BATCH_MAX_ITEMS,
+    CREATED,
+    INACTIVE,
+    INVALID,
+    FAILED,
+    IngestQueueFull,
+    IngestTimeout,
+    commit_submissions,
+    submission_buffer
 )
-from .auth import create_token, hash_password, verify_password
-from .deps import get_current_user
-from .ai import router as ai_router, ask_ai
 
 # ======================================================
 # APP INIT
 # ======================================================
 app = FastAPI(title="University Evaluation System API")
 
-Base.metadata.create_all(bind=engine)
 app.include_router(ai_router)
 
+startup.mark("imports")
+
+# ======================================================
+# SCHEMA MIGRATIONS (BEFORE ANY OTHER STARTUP WORK)
+# ======================================================
+@app.on_event("startup")
+def migrate_schema():
+    startup.mark("server")
+
+    # a single version SELECT when the schema is already current
+    upgrade(engine)
+    startup.mark("migrations")
+
+# ======================================================
+# ADMISSION CONTROL (BEFORE ANY DB SESSION OR UPSTREAM CALL)
+# ======================================================
+# Added before CORS so CORS wraps it and its 429s reach the browser
+if RATE_LIMIT_ENABLED:
+    app.add_middleware(RateLimitMiddleware)
+
 # ======================================================
 # ✅ PRODUCTION-SAFE CORS (FIXES MOBILE ERROR)
 # ======================================================
@@ -48,47 +121,138 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# ======================================================
+# PER-REQUEST QUERY COUNTER (X-Query-Count / X-Query-Time-Ms)
+# ======================================================
+install_query_stats(engine)
+install_query_stats(async_engine.sync_engine)
+app.add_middleware(QueryStatsMiddleware)
+
+# ======================================================
+# PROMETHEUS METRICS (OUTERMOST: TIMES THE WHOLE STACK)
+# ======================================================
+app.add_middleware(MetricsMiddleware, routes=app.router.routes)
+
+
+@register_collector
+def pool_metrics():
+    yield "# HELP db_pool_connections Pool connections by state."
+    yield "# TYPE db_pool_connections gauge"
+    stats = {"async": pool_status(async_engine.sync_engine), "sync": pool_status(engine)}
+    for name, status in stats.items():
+        for state in ("checked_in", "checked_out", "overflow"):
+            if state in status:
+                yield f'db_pool_connections{{engine="{name}",state="{state}"}} {max(status[state], 0)}'
+
+    for metric, key in (("db_pool_waits_total", "waits"), ("db_pool_timeouts_total", "timeouts")):
+        yield f"# TYPE {metric} counter"
+        for name, status in stats.items():
+            if key in status:
+                yield f'{metric}{{engine="{name}"}} {status[key]}'
+
 # ======================================================
 # DB DEPENDENCY
 # ======================================================
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with AsyncSessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 # ======================================================
 # SEED DEFAULT USERS
 # ======================================================
 @app.on_event("startup")
 def seed_users():
+    # APP_STARTUP_MODE=fast: seeded once via `python -m app.seed` instead
+    if startup.FAST_STARTUP:
+        return
+
     db = SessionLocal()
+    try:
+        seed_default_users(db)
+    finally:
+        db.close()
+    startup.mark("seed")
+
+# ======================================================
+# BUFFERED INGEST (OPTIONAL GROUP COMMIT)
+# ======================================================
+@app.on_event("startup")
+def start_ingest_buffer():
+    if INGEST_BUFFERED:
+        submission_buffer.start()
 
-    if not db.query(User).filter_by(username="admin").first():
-        db.add(User(username="admin", password=hash_password("admin123"), role="admin"))
 
-    if not db.query(User).filter_by(username="hr").first():
-        db.add(User(username="hr", password=hash_password("hr123"), role="hr"))
+@app.on_event("shutdown")
+def stop_ingest_buffer():
+    submission_buffer.stop()
 
-    db.commit()
-    db.close()
+# ======================================================
+# CROSS-WORKER CACHE INVALIDATION (SET UP BY app.serve)
+# ======================================================
+@app.on_event("startup")
+def start_invalidation_bus():
+    invalidation_bus.start()
+
+
+@app.on_event("shutdown")
+def stop_invalidation_bus():
+    invalidation_bus.stop()
+
+
+# LAST STARTUP HOOK
+@app.on_event("startup")
+def startup_complete():
+    startup.mark("ready")
 
 # ======================================================
 # ROOT HEALTH CHECK (IMPORTANT FOR RENDER + MOBILE)
 # ======================================================
 @app.get("/")
-def root():
+async def root():
+    startup.first_response()
     return {"status": "API running"}
 
+
+@app.get("/health/startup")
+async def health_startup():
+    return startup.report()
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    return PlainTextResponse(render_metrics(), media_type="text/plain; version=0.0.4")
+
+# ======================================================
+# DATABASE HEALTH + POOL STATS (MONITORING)
+# ======================================================
+@app.get("/health/db")
+async def health_db():
+    started = perf_counter()
+    try:
+        async with async_engine.connect() as conn:
+            await conn.execute(text("SELECT 1"))
+        ok = True
+    except Exception:
+        ok = False
+
+    return {
+        "ok": ok,
+        "dialect": async_engine.dialect.name,
+        "ping_ms": round((perf_counter() - started) * 1000, 2),
+        "pools": {
+            "async": pool_status(async_engine.sync_engine),
+            "sync": pool_status(engine),
+        }
+    }
+
 # ======================================================
 # AUTH — LOGIN
 # ======================================================
-@app.post("/login")
-def login(data: LoginSchema, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == data.username).first()
+@app.post("/login", dependencies=[Depends(query_budget(1))])
+async def login(data: LoginSchema, db: AsyncSession = Depends(get_db)):
+    user = await db.scalar(select(User).where(User.username == data.username).limit(1))
 
-    if not user or not verify_password(data.password, user.password):
+    if not user or not await verify_password_async(data.password, user.password):
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
     token = create_token({"id": user.id, "role": user.role, "department_id": user.department_id})
@@ -104,140 +268,157 @@ def login(data: LoginSchema, db: Session = Depends(get_db)):
 # REGISTER (PUBLIC)
 # ======================================================
 @app.post("/register")
-def register(data: LoginSchema, db: Session = Depends(get_db)):
-    if db.query(User).filter_by(username=data.username).first():
+async def register(data: LoginSchema, db: AsyncSession = Depends(get_db)):
+    if await db.scalar(select(User.id).filter_by(username=data.username).limit(1)):
         raise HTTPException(status_code=400, detail="Username already exists")
 
-    user = User(username=data.username, password=hash_password(data.password), role="user")
+    user = User(username=data.username, password=await hash_password_async(data.password), role="user")
     db.add(user)
-    db.commit()
+    await db.commit()
     return {"message": "Account created"}
 
 # ======================================================
 # USERS (ADMIN + HR)
 # ======================================================
-@app.get("/users")
-def get_users(user=Depends(get_current_user), db: Session = Depends(get_db)):
+@app.get("/users", response_model=List[UserOut], dependencies=[Depends(query_budget(1))])
+async def get_users(user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403)
-    return db.query(User).all()
+    return (await db.execute(select(*columns(UserOut, User)))).all()
 
 
 @app.put("/users/{user_id}")
-def update_user(user_id: int, data: UpdateUserSchema, user=Depends(get_current_user), db: Session = Depends(get_db)):
+async def update_user(user_id: int, data: UpdateUserSchema, user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403)
 
-    target = db.query(User).filter(User.id == user_id).first()
+    target = await db.get(User, user_id)
     if not target:
         raise HTTPException(status_code=404)
 
     target.username = data.username
     target.role = data.role
     target.department_id = data.department_id
-    db.commit()
+    await db.commit()
+    revoke_user_tokens(target.id)
     return {"message": "User updated"}
 
 
 @app.delete("/users/{user_id}")
-def delete_user(user_id: int, user=Depends(get_current_user), db: Session = Depends(get_db)):
+async def delete_user(user_id: int, user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403)
 
-    target = db.query(User).filter(User.id == user_id).first()
+    target = await db.get(User, user_id)
     if not target:
         raise HTTPException(status_code=404)
 
     if target.role == "admin":
         raise HTTPException(status_code=400, detail="Cannot delete admin")
 
-    db.delete(target)
-    db.commit()
+    await db.delete(target)
+    await db.commit()
+    revoke_user_tokens(target.id)
     return {"message": "User deleted"}
 
 # ======================================================
 # DEPARTMENTS
 # ======================================================
-@app.get("/departments")
-def list_departments(user=Depends(get_current_user), db: Session = Depends(get_db)):
+@app.get("/departments", dependencies=[Depends(query_budget(1))])
+async def list_departments(user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403)
 
-    result = []
-    for d in db.query(Department).all():
-        head = db.query(User).filter_by(role="head", department_id=d.id).first()
-        result.append({"id": d.id, "name": d.name, "head_name": head.username if head else None})
+    # ONE GROUPED QUERY INSTEAD OF ONE HEAD LOOKUP PER DEPARTMENT
+    rows = await db.execute(
+        select(Department.id, Department.name, func.min(User.username))
+        .outerjoin(User, and_(User.department_id == Department.id, User.role == "head"))
+        .group_by(Department.id, Department.name)
+        .order_by(Department.id)
+    )
 
-    return result
+    return ORJSONResponse([
+        {"id": dept_id, "name": name, "head_name": head_name}
+        for dept_id, name, head_name in rows
+    ])
 
 
 @app.post("/departments")
-def create_department(data: DepartmentCreate, user=Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_department(data: DepartmentCreate, user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if user["role"] != "hr":
         raise HTTPException(status_code=403)
 
-    existing = db.query(Department).filter(
-        func.lower(func.trim(Department.name)) == func.lower(func.trim(data.name))
-    ).first()
+    existing = await db.scalar(
+        select(Department).where(
+            func.lower(func.trim(Department.name)) == func.lower(func.trim(data.name))
+        ).limit(1)
+    )
 
     if existing:
         return {"id": existing.id, "name": existing.name}
 
     dept = Department(name=data.name.strip())
     db.add(dept)
-    db.commit()
-    db.refresh(dept)
+    await db.commit()
     return {"id": dept.id, "name": dept.name}
 
 
 @app.put("/departments/{dept_id}/assign-head")
-def assign_head(dept_id: int, data: AssignHeadSchema, user=Depends(get_current_user), db: Session = Depends(get_db)):
+async def assign_head(dept_id: int, data: AssignHeadSchema, user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403)
 
-    head = db.query(User).filter_by(username=data.username).first()
+    head = await db.scalar(select(User).filter_by(username=data.username).limit(1))
     if not head:
         raise HTTPException(status_code=404, detail="User not found")
 
     head.role = "head"
     head.department_id = dept_id
-    db.commit()
+    await db.commit()
+    revoke_user_tokens(head.id)
     return {"message": "Head assigned"}
 
 
 @app.put("/departments/{dept_id}/remove-head")
-def remove_head(dept_id: int, user=Depends(get_current_user), db: Session = Depends(get_db)):
+async def remove_head(dept_id: int, user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403)
 
-    head = db.query(User).filter_by(role="head", department_id=dept_id).first()
+    head = await db.scalar(select(User).filter_by(role="head", department_id=dept_id).limit(1))
     if not head:
         raise HTTPException(status_code=404, detail="No head assigned")
 
     head.role = "user"
     head.department_id = None
-    db.commit()
+    await db.commit()
+    revoke_user_tokens(head.id)
     return {"message": "Head removed"}
 
 
 @app.delete("/departments/{dept_id}")
-def delete_department(dept_id: int, user=Depends(get_current_user), db: Session = Depends(get_db)):
+async def delete_department(dept_id: int, user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if user["role"] not in ["admin", "hr"]:
         raise HTTPException(status_code=403)
 
-    dept = db.query(Department).filter_by(id=dept_id).first()
+    dept = await db.get(Department, dept_id)
     if not dept:
         raise HTTPException(status_code=404)
 
-    db.delete(dept)
-    db.commit()
+    # its users' tokens still carry the department and role
+    member_ids = (await db.scalars(select(User.id).filter_by(department_id=dept_id))).all()
+
+    await db.delete(dept)
+    await db.commit()
+    invalidate_active(dept_id)
+    for member_id in member_ids:
+        revoke_user_tokens(member_id)
     return {"message": "Department deleted"}
 
 # ======================================================
 # QUESTIONNAIRES
 # ======================================================
 @app.post("/questionnaires")
-def create_questionnaire(data: QuestionnaireCreate, user=Depends(get_current_user), db: Session = Depends(get_db)):
+async def create_questionnaire(data: QuestionnaireCreate, user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if user["role"] != "head":
         raise HTTPException(status_code=403)
 
@@ -249,92 +430,356 @@ def create_questionnaire(data: QuestionnaireCreate, user=Depends(get_current_use
     )
 
     db.add(q)
-    db.commit()
-    db.refresh(q)
+    await db.commit()
     return {"id": q.id}
 
 
-@app.get("/questionnaires")
-def list_questionnaires(user=Depends(get_current_user), db: Session = Depends(get_db)):
+@app.get("/questionnaires", response_model=List[QuestionnaireOut], dependencies=[Depends(query_budget(1))])
+async def list_questionnaires(user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
+    query = select(*columns(QuestionnaireOut, Questionnaire))
+
     if user["role"] == "admin":
-        return db.query(Questionnaire).all()
+        return (await db.execute(query)).all()
 
     if user["role"] == "head":
-        return db.query(Questionnaire).filter(Questionnaire.department_id == user["department_id"]).all()
+        return (await db.execute(
+            query.where(Questionnaire.department_id == user["department_id"])
+        )).all()
 
     raise HTTPException(status_code=403)
 
 
 @app.post("/questionnaires/{qid}/activate")
-def activate_questionnaire(qid: int, user=Depends(get_current_user), db: Session = Depends(get_db)):
+async def activate_questionnaire(qid: int, user=Depends(get_current_user), db: AsyncSession = Depends(get_db)):
     if user["role"] != "head":
         raise HTTPException(status_code=403)
 
-    db.query(Questionnaire).filter(
-        Questionnaire.department_id == user["department_id"]
-    ).update({Questionnaire.is_active: False})
+    await db.execute(
+        update(Questionnaire)
+        .where(Questionnaire.department_id == user["department_id"])
+        .values(is_active=False)
+    )
 
-    q = db.query(Questionnaire).filter(
-        Questionnaire.id == qid,
-        Questionnaire.department_id == user["department_id"]
-    ).first()
+    q = await db.scalar(
+        select(Questionnaire).where(
+            Questionnaire.id == qid,
+            Questionnaire.department_id == user["department_id"]
+        )
+    )
 
     if not q:
         raise HTTPException(status_code=404)
 
     q.is_active = True
-    db.commit()
+    await db.commit()
+    invalidate_active(user["department_id"])
     return {"message": "Activated"}
 
 # ======================================================
 # PUBLIC EVALUATION
 # ======================================================
-@app.get("/public/active-questionnaire")
-def get_active_questionnaire(db: Session = Depends(get_db)):
-    q = db.query(Questionnaire).filter(
-        Questionnaire.is_active == True
-    ).order_by(Questionnaire.created_at.desc()).first()
+@app.get("/public/active-questionnaire", dependencies=[Depends(query_budget(1))])
+async def get_active_questionnaire(
+    request: Request,
+    response: Response,
+    department_id: Optional[int] = None
+):
+    # SERVED FROM THE IN-PROCESS CACHE — NO DB WORK ON A HIT
+    q = await lookup_active(department_id)
 
     if not q:
         raise HTTPException(status_code=404)
 
-    return {"id": q.id, "content": q.content}
-
-
-@app.post("/evaluations/{qid}/submit")
-def submit_evaluation(qid: int, data: EvaluationSubmitSchema, db: Session = Depends(get_db)):
-    q = db.query(Questionnaire).filter_by(id=qid, is_active=True).first()
+    headers = {"ETag": q["etag"], "Cache-Control": "no-cache"}
+    if request.headers.get("if-none-match") == q["etag"]:
+        return Response(status_code=304, headers=headers)
+
+    response.headers.update(headers)
+    return {"id": q["id"], "content": q["content"]}
+
+
+@app.post("/evaluations/{qid}/submit", dependencies=[Depends(query_budget(5))])
+async def submit_evaluation(qid: int, data: EvaluationSubmitSchema, db: AsyncSession = Depends(get_db)):
+    if INGEST_BUFFERED:
+        # GROUP COMMIT: RETURNS ONCE THE SHARED BATCH IS DURABLE
+        try:
+            result = await submission_buffer.submit_async(qid, data.dict())
+        except IngestQueueFull:
+            raise HTTPException(
+                status_code=503,
+                detail="Submission queue is full",
+                headers={"Retry-After": "1"}
+            )
+        except IngestTimeout:
+            # the row may still commit: a blind retry could record it twice
+            raise HTTPException(
+                status_code=504,
+                detail="Submission timed out and may still be recorded"
+            )
+
+        if result == INACTIVE:
+            raise HTTPException(status_code=404)
+        if result == FAILED:
+            raise HTTPException(status_code=422, detail="Submission rejected")
+        return {"message": "Submitted"}
+
+    q = await db.scalar(select(Questionnaire.id).filter_by(id=qid, is_active=True))
     if not q:
         raise HTTPException(status_code=404)
 
-    ev = EvaluationResponse(questionnaire_id=qid, **data.dict())
+    ev = EvaluationResponse(questionnaire_id=qid, submitted_at=datetime.utcnow(), **data.dict())
+    ev.scores = [
+        EvaluationScore(question_idx=idx, questionnaire_id=qid, score=score)
+        for idx, score in enumerate(data.ratings)
+    ]
     db.add(ev)
-    db.commit()
+    await db.run_sync(apply_rollups, [ev])
+    await db.commit()
     return {"message": "Submitted"}
 
 
-@app.get("/head/evaluations")
-def head_evaluations(user=Depends(get_current_user), db: Session = Depends(get_db)):
+@app.post("/evaluations/batch")
+async def submit_evaluation_batch(data: BatchEvaluationSubmitSchema, db: AsyncSession = Depends(get_db)):
+    if len(data.items) > BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {BATCH_MAX_ITEMS} items per batch"
+        )
+
+    # VALIDATE PER ITEM: ONE BAD ITEM MUST NOT BLOCK THE DEVICE'S REPLAY
+    results = [INVALID] * len(data.items)
+    valid = {}
+    for i, raw in enumerate(data.items):
+        try:
+            valid[i] = BatchEvaluationItem.model_validate(raw)
+        except ValidationError:
+            pass
+
+    fields = set(EvaluationSubmitSchema.model_fields)
+    written = await db.run_sync(
+        commit_submissions,
+        [(item.questionnaire_id, item.model_dump(include=fields)) for item in valid.values()],
+        keys=[item.idempotency_key for item in valid.values()]
+    )
+    for i, result in zip(valid, written):
+        results[i] = result
+
+    return {
+        "created": results.count(CREATED),
+        "results": [
+            {"idempotency_key": raw.get("idempotency_key"), "status": result}
+            for raw, result in zip(data.items, results)
+        ]
+    }
+
+
+@app.get("/head/evaluations", response_model=EvaluationPage, dependencies=[Depends(query_budget(1))])
+async def head_evaluations(
+    cursor: Optional[int] = None,
+    limit: int = Query(100, ge=1, le=500),
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
     if user["role"] != "head":
         raise HTTPException(status_code=403)
 
-    return (
-        db.query(EvaluationResponse)
-        .join(Questionnaire)
-        .filter(Questionnaire.department_id == user["department_id"])
-        .all()
+    # KEYSET PAGINATION: NEWEST FIRST, `cursor` IS THE LAST ID SEEN
+    query = (
+        select(*columns(EvaluationOut, EvaluationResponse))
+        .join(Questionnaire, Questionnaire.id == EvaluationResponse.questionnaire_id)
+        .where(Questionnaire.department_id == user["department_id"])
     )
+    if cursor is not None:
+        query = query.where(EvaluationResponse.id < cursor)
+
+    items = (await db.execute(
+        query.order_by(EvaluationResponse.id.desc()).limit(limit + 1)
+    )).all()
+    has_more = len(items) > limit
+    items = items[:limit]
+
+    return {
+        "items": items,
+        "next_cursor": items[-1].id if has_more else None
+    }
+
+
+@app.get("/head/evaluations/search", response_model=EvaluationSearchPage, dependencies=[Depends(query_budget(2))])
+async def search_head_evaluations(
+    q: str = Query(..., min_length=1, max_length=200),
+    questionnaire_id: Optional[int] = None,
+    offset: int = Query(0, ge=0, le=10000),
+    limit: int = Query(50, ge=1, le=200),
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if user["role"] != "head":
+        raise HTTPException(status_code=403)
+
+    # RANKED FULL-TEXT MATCHES IN THE HEAD'S DEPARTMENT, OFFSET-PAGED
+    scope = select(Questionnaire.id).where(Questionnaire.department_id == user["department_id"])
+    if questionnaire_id is not None:
+        scope = scope.where(Questionnaire.id == questionnaire_id)
+    questionnaire_ids = (await db.scalars(scope)).all()
+
+    query = search_query(db.get_bind().dialect.name, questionnaire_ids, q, offset, limit + 1)
+    if query is None:
+        return {"items": [], "next_offset": None}
+
+    items = (await db.execute(query)).all()
+    has_more = len(items) > limit
+
+    return {
+        "items": items[:limit],
+        "next_offset": offset + limit if has_more else None
+    }
+
+
+@app.get("/head/evaluations/export")
+async def export_head_evaluations(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    user=Depends(get_current_user)
+):
+    if user["role"] != "head":
+        raise HTTPException(status_code=403)
+
+    return StreamingResponse(
+        export_department(user["department_id"], format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={
+            "Content-Disposition": f'attachment; filename="evaluations.{format}"'
+        }
+    )
+
+
+@app.get("/head/evaluations/summary", dependencies=[Depends(query_budget(3))])
+async def head_evaluations_summary(
+    questionnaire_id: Optional[int] = None,
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if user["role"] != "head":
+        raise HTTPException(status_code=403)
+
+    return ORJSONResponse(
+        await db.run_sync(department_summary, user["department_id"], questionnaire_id)
+    )
+
+
+@app.get("/head/evaluations/trend", dependencies=[Depends(query_budget(2))])
+async def head_evaluations_trend(
+    bucket: str = Query("week", pattern="^(day|week|month)$"),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    questionnaire_id: Optional[int] = None,
+    user=Depends(get_current_user),
+    db: AsyncSession = Depends(get_db)
+):
+    if user["role"] != "head":
+        raise HTTPException(status_code=403)
+
+    if start and end and start > end:
+        raise HTTPException(status_code=422, detail="start must not be after end")
+
+    # RESPONSES + PER-QUESTION MEANS PER PERIOD (UTC DAYS OF submitted_at)
+    return ORJSONResponse(
+        await db.run_sync(department_trend, user["department_id"], bucket, start, end, questionnaire_id)
+    )
+
+
+# AI SUMMARY OF FEEDBACK MESSAGES (ONLY NEW RESPONSES GO UPSTREAM)
+@app.post("/head/evaluations/feedback-summary")
+async def head_feedback_summary(questionnaire_id: Optional[int] = None, user=Depends(get_current_user)):
+    if user["role"] != "head":
+        raise HTTPException(status_code=403)
+
+    try:
+        return await summarize_feedback(user["department_id"], questionnaire_id)
+    except SummaryFailed as exc:
+        raise HTTPException(status_code=502, detail=str(exc))
+
+# ======================================================
+# EMAIL INVITATIONS (QUEUED, SENT IN THE BACKGROUND)
+# ======================================================
+@app.post("/invitations", status_code=202)
+async def send_invitations(data: BulkInvitationSchema, user=Depends(get_current_user)):
+    if user["role"] not in ["head", "hr"]:
+        raise HTTPException(status_code=403)
+
+    recipients = list(dict.fromkeys(r.strip() for r in data.recipients if r.strip()))
+    if len(recipients) > INVITATION_MAX_RECIPIENTS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"At most {INVITATION_MAX_RECIPIENTS} recipients per request"
+        )
+
+    invalid = [r for r in recipients if not valid_address(r)]
+    if invalid:
+        raise HTTPException(status_code=422, detail={"invalid_recipients": invalid})
+
+    # ONLY LINKS INTO THIS APP: THE UNIVERSITY MAILBOX IS NOT A RELAY
+    if not valid_link(data.link, ALLOWED_ORIGINS):
+        raise HTTPException(status_code=422, detail="Link must point to this application")
+
+    if not email_configured():
+        raise HTTPException(status_code=503, detail="Email is not configured")
+
+    try:
+        job = email_dispatcher.enqueue_invitations(recipients, data.link)
+    except EmailQueueFull:
+        raise HTTPException(
+            status_code=503,
+            detail="Email queue is full",
+            headers={"Retry-After": "30"}
+        )
+
+    return {"job_id": job["id"], "queued": job["total"]}
+
+
+@app.get("/invitations/{job_id}")
+async def invitation_status(job_id: str, user=Depends(get_current_user)):
+    if user["role"] not in ["head", "hr"]:
+        raise HTTPException(status_code=403)
+
+    status = job_status(job_id)
+    if status is None:
+        raise HTTPException(status_code=404)
+    return status
 
 # ======================================================
 # AI CHAT
 # ======================================================
 @app.post("/chat")
-def chat(data: ChatSchema, user=Depends(get_current_user)):
+async def chat(data: ChatSchema, stream: bool = False, user=Depends(get_current_user)):
     if user["role"] != "head":
         raise HTTPException(status_code=403)
-    return {"reply": ask_ai(data.message)}
+    if stream:
+        return sse_reply(data.message)
+    return {"reply": await ask_ai(data.message)}
 
 
 @app.post("/public/chat")
-def public_chat(data: ChatSchema):
-    return {"reply": ask_ai(data.message)}
+async def public_chat(data: ChatSchema, stream: bool = False):
+    if stream:
+        return sse_reply(data.message)
+    return {"reply": await ask_ai(data.message)}
+
+
+@app.on_event("shutdown")
+async def close_ai_client():
+    await close_groq_client()
+
+
+@app.on_event("shutdown")
+def stop_email_dispatcher():
+    email_dispatcher.stop()
+
+
+@app.on_event("shutdown")
+def stop_hash_pool():
+    shutdown_hash_pool()
+
+
+@app.on_event("shutdown")
+async def dispose_async_engine():
+    await async_engine.dispose()
@@ -0,0 +1,252 @@
+from bisect import bisect_left
+from threading import Lock
+from time import perf_counter
+
+from .cache import LRUCache, MISSING
+
+# ======================================================
+# METRIC TYPES (PROMETHEUS TEXT FORMAT 0.0.4)
+# ======================================================
+# Deliberately tiny: a label tuple -> value dict behind one lock per
+# metric. Observing is a dict lookup and an add; formatting only happens
+# when /metrics is scraped.
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+REGISTRY = []
+COLLECTORS = []
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + "}"
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = Lock()
+        REGISTRY.append(self)
+
+    def header(self):
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, *labels, amount: float = 1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = list(self._values.items())
+        for labels, value in values:
+            yield f"{self.name}{_labels(self.labelnames, labels)} {value}"
+
+
+class Gauge(Counter):
+    kind = "gauge"
+
+    def dec(self, *labels, amount: float = 1):
+        self.inc(*labels, amount=-amount)
+
+    def set(self, *labels, value: float):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, *labels, value: float):
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                # per-bucket counts (+Inf last), sum
+                series = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][bisect_left(self.buckets, value)] += 1
+            series[1] += value
+
+    def time(self, *labels):
+        return _Timer(self, labels)
+
+    def samples(self):
+        with self._lock:
+            values = [(labels, list(counts), total) for labels, (counts, total) in self._values.items()]
+
+        names = self.labelnames + ("le",)
+        for labels, counts, total in values:
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(names, labels + (bound,))} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labelnames, labels)} {total}"
+            yield f"{self.name}_count{_labels(self.labelnames, labels)} {cumulative}"
+
+
+class _Timer:
+    """
+    `with histogram.time("label"):` for sync code; `async with` works too.
+    """
+    __slots__ = ("histogram", "labels", "started")
+
+    def __init__(self, histogram, labels):
+        self.histogram = histogram
+        self.labels = labels
+
+    def __enter__(self):
+        self.started = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.histogram.observe(*self.labels, value=perf_counter() - self.started)
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *exc):
+        self.__exit__(*exc)
+
+
+def register_collector(fn):
+    """
+    fn() -> iterable of exposition lines, evaluated at scrape time (for
+    values that already live elsewhere, e.g. pool sizes).
+    """
+    COLLECTORS.append(fn)
+    return fn
+
+
+def render() -> str:
+    lines = []
+    for metric in REGISTRY:
+        lines.extend(metric.header())
+        lines.extend(metric.samples())
+    for collector in COLLECTORS:
+        lines.extend(collector())
+    return "\n".join(lines) + "\n"
+
+# ======================================================
+# METRICS
+# ======================================================
+http_requests = Counter(
+    "http_requests_total", "HTTP requests by route template and status.",
+    ("method", "route", "status")
+)
+http_latency = Histogram(
+    "http_request_duration_seconds", "HTTP request latency by route template.",
+    ("method", "route")
+)
+http_in_flight = Gauge(
+    "http_requests_in_flight", "HTTP requests currently being served.",
+    ("method", "route")
+)
+sql_latency = Histogram(
+    "db_query_duration_seconds", "SQL statement execution time.",
+    ("operation",)
+)
+pool_checkout_latency = Histogram(
+    "db_pool_checkout_duration_seconds", "Time to check a connection out of the pool.",
+    ("engine",)
+)
+ai_latency = Histogram(
+    "ai_request_duration_seconds", "ask_ai latency by how the reply was obtained.",
+    ("source",), buckets=(0.001, 0.01, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+password_latency = Histogram(
+    "password_hash_duration_seconds", "Password hashing / verification time.",
+    ("operation",), buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+invalidation_messages = Counter(
+    "cache_invalidations_total", "Cross-worker cache invalidation messages.",
+    ("channel", "direction")
+)
+rate_limited = Counter(
+    "http_rate_limited_total", "Requests shed with 429 by the admission controller.",
+    ("endpoint_class", "reason")
+)
+
+SQL_OPERATIONS = {"SELECT", "INSERT", "UPDATE", "DELETE"}
+
+
+def sql_operation(statement: str) -> str:
+    verb = statement.lstrip()[:6].upper()
+    return verb.lower() if verb in SQL_OPERATIONS else "other"
+
+# ======================================================
+# ASGI MIDDLEWARE
+# ======================================================
+UNMATCHED_ROUTE = "<unmatched>"
+ROUTE_CACHE_SIZE = 4096
+
+
+class MetricsMiddleware:
+    """
+    Labels by route template ("/users/{user_id}"), never the raw path,
+    so series count stays bounded.
+    """
+
+    def __init__(self, app, routes):
+        self.app = app
+        self.routes = routes
+        self._resolved = LRUCache(maxsize=ROUTE_CACHE_SIZE)
+
+    def _match(self, method: str, path: str) -> str:
+        partial = None
+        for route in self.routes:
+            regex = getattr(route, "path_regex", None)
+            if regex is None or not regex.match(path):
+                continue
+            methods = getattr(route, "methods", None)
+            if not methods or method in methods:
+                return route.path
+            partial = partial or route.path
+        return partial or UNMATCHED_ROUTE
+
+    def _route(self, scope) -> str:
+        key = (scope["method"], scope["path"])
+        route = self._resolved.get(key)
+        if route is MISSING:
+            route = self._match(*key)
+            self._resolved.set(key, route)
+        return route
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        route = self._route(scope)
+        status = 500
+
+        async def send_with_status(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        http_in_flight.inc(method, route)
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            http_in_flight.dec(method, route)
+            http_latency.observe(method, route, value=perf_counter() - started)
+            http_requests.inc(method, route, str(status))
@@ -0,0 +1,275 @@
+"""
+Versioned schema migrations (replaces create_all at import time).
+
+    python -m app.migrations            # upgrade to the latest version
+    python -m app.migrations current    # print the applied version
+
+Each migration runs once, in order, inside one transaction, and records
+its number in `schema_version`. Migrations are written to be idempotent
+so a database first created by an older create_all upgrades cleanly.
+"""
+from datetime import datetime
+import logging
+import sys
+
+from sqlalchemy import (
+    Column,
+    DateTime,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    cast,
+    exists,
+    func,
+    inspect,
+    select,
+    text,
+    true,
+    update,
+)
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm import Session
+
+from .database import Base
+from .models import Questionnaire, EvaluationResponse, EvaluationScore, FeedbackChunkSummary
+from .rollups import recompute_rollups
+from .search import create_search_index, drop_search_index
+
+logger = logging.getLogger(__name__)
+
+version_metadata = MetaData()
+
+schema_version = Table(
+    "schema_version",
+    version_metadata,
+    Column("version", Integer, primary_key=True),
+    Column("description", String, nullable=False),
+    Column("applied_at", DateTime, default=datetime.utcnow, nullable=False),
+)
+
+MIGRATIONS = []
+
+# PostgreSQL advisory lock id serializing concurrent upgrades
+MIGRATION_LOCK_ID = 724_0001
+
+
+def migration(version: int, description: str):
+    def register(fn):
+        MIGRATIONS.append((version, description, fn))
+        MIGRATIONS.sort(key=lambda m: m[0])
+        return fn
+    return register
+
+
+def _create_indexes(conn, *indexes):
+    for index in indexes:
+        index.create(conn, checkfirst=True)
+
+
+def _index(table, name):
+    return next(index for index in table.indexes if index.name == name)
+
+# ======================================================
+# MIGRATIONS
+# ======================================================
+@migration(1, "baseline tables")
+def _baseline(conn):
+    Base.metadata.create_all(conn, checkfirst=True)
+
+
+@migration(2, "hot-path indexes and one active questionnaire per department")
+def _hot_path_indexes(conn):
+    table = Questionnaire.__table__
+
+    # keep only the newest active questionnaire per department so the
+    # partial unique index can be built on existing data
+    newest_active = (
+        select(func.max(table.c.id))
+        .where(table.c.is_active == True)
+        .group_by(table.c.department_id)
+    )
+    conn.execute(
+        update(table)
+        .where(table.c.is_active == True, table.c.id.not_in(newest_active))
+        .values(is_active=False)
+    )
+
+    _create_indexes(
+        conn,
+        _index(Base.metadata.tables["users"], "ix_users_role_department"),
+        _index(table, "ix_questionnaires_dept_active_created"),
+        _index(table, "ix_questionnaires_active_created"),
+        _index(table, "uq_questionnaires_one_active"),
+        _index(Base.metadata.tables["evaluation_responses"], "ix_evaluation_responses_questionnaire"),
+    )
+
+
+@migration(3, "normalized per-question evaluation scores")
+def _evaluation_scores(conn):
+    responses = EvaluationResponse.__table__
+    scores = EvaluationScore.__table__
+
+    scores.create(conn, checkfirst=True)
+    _create_indexes(conn, _index(scores, "ix_evaluation_scores_questionnaire_question"))
+
+    # unnest the ratings JSON inside the database, skipping responses
+    # that already have scores
+    if conn.dialect.name == "postgresql":
+        elems = func.json_array_elements_text(responses.c.ratings).table_valued(
+            "value", with_ordinality="ordinality"
+        )
+        question_idx, score = elems.c.ordinality - 1, cast(elems.c.value, Integer)
+    else:
+        elems = func.json_each(responses.c.ratings).table_valued("key", "value")
+        question_idx, score = elems.c.key, elems.c.value
+
+    backfill = (
+        select(responses.c.id, question_idx, responses.c.questionnaire_id, score)
+        .select_from(responses.join(elems, true()))
+        .where(~exists().where(scores.c.response_id == responses.c.id))
+    )
+    conn.execute(
+        scores.insert().from_select(
+            ["response_id", "question_idx", "questionnaire_id", "score"],
+            backfill
+        )
+    )
+
+
+@migration(4, "persisted feedback chunk summaries")
+def _feedback_chunk_summaries(conn):
+    FeedbackChunkSummary.__table__.create(conn, checkfirst=True)
+
+
+@migration(5, "full-text search over evaluation feedback")
+def _feedback_search(conn):
+    # FTS5 table + triggers on SQLite, generated tsvector + GIN on PostgreSQL
+    create_search_index(conn)
+
+
+# client `date` (+ `time` when it parses) -> timestamp, NULL when the date
+# does not parse; SQLite values use SQLAlchemy's DateTime storage format
+_SUBMITTED_AT_BACKFILL = {
+    "sqlite": """
+        UPDATE evaluation_responses SET submitted_at = coalesce(
+            datetime(substr("date", 1, 10) || ' ' || substr("time", 1, 5)),
+            datetime(substr("date", 1, 10))
+        ) || '.000000'
+        WHERE submitted_at IS NULL
+          -- datetime() passes days like 02-30 through; julianday() normalizes them
+          AND date(julianday(substr("date", 1, 10))) = substr("date", 1, 10)
+    """,
+    "postgresql": """
+        UPDATE evaluation_responses SET submitted_at = coalesce(
+            pg_temp.try_timestamp(substr("date", 1, 10) || ' ' || substr("time", 1, 5)),
+            pg_temp.try_timestamp(substr("date", 1, 10))
+        )
+        WHERE submitted_at IS NULL AND "date" ~ '^\\d{4}-\\d{2}-\\d{2}'
+    """,
+}
+
+# a cast that returns NULL instead of aborting the migration
+_POSTGRESQL_TRY_TIMESTAMP = """
+    CREATE OR REPLACE FUNCTION pg_temp.try_timestamp(value text) RETURNS timestamp AS $$
+    BEGIN
+        RETURN value::timestamp;
+    EXCEPTION WHEN others THEN
+        RETURN NULL;
+    END
+    $$ LANGUAGE plpgsql
+"""
+
+
+@migration(6, "server-assigned submission timestamps")
+def _submitted_at(conn):
+    responses = EvaluationResponse.__table__
+
+    if "submitted_at" not in {c["name"] for c in inspect(conn).get_columns(responses.name)}:
+        column_type = responses.c.submitted_at.type.compile(dialect=conn.dialect)
+        conn.execute(text(f"ALTER TABLE evaluation_responses ADD COLUMN submitted_at {column_type}"))
+
+    if conn.dialect.name == "postgresql":
+        conn.execute(text(_POSTGRESQL_TRY_TIMESTAMP))
+    # rows whose date did not parse stay NULL; migration 7 rebuilds the
+    # rollups, which file them under UNDATED
+    conn.execute(text(_SUBMITTED_AT_BACKFILL[conn.dialect.name]))
+
+    _create_indexes(conn, _index(responses, "ix_evaluation_responses_questionnaire_submitted"))
+
+
+@migration(7, "backfill evaluation rollups")
+def _backfill_rollups(conn):
+    # create_all made the rollup tables empty on databases that already
+    # had responses; recompute them the way migration 3 fills the scores
+    with Session(bind=conn) as db:
+        recompute_rollups(db)
+
+
+@migration(8, "search terms no longer match questionnaire ids")
+def _unindexed_search_scope(conn):
+    # the FTS5 table indexed questionnaire_id as text; recreate it with the
+    # column UNINDEXED (the tsvector on PostgreSQL never included it)
+    if conn.dialect.name == "sqlite":
+        drop_search_index(conn)
+        create_search_index(conn)
+
+# ======================================================
+# RUNNER
+# ======================================================
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def current_version(conn) -> int:
+    if not inspect(conn).has_table(schema_version.name):
+        return 0
+    return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+
+
+def applied_version(engine):
+    """
+    One plain SELECT, no reflection or lock: the warm-start check. None
+    when the version table does not exist yet.
+    """
+    try:
+        with engine.connect() as conn:
+            return conn.execute(select(func.max(schema_version.c.version))).scalar() or 0
+    except DBAPIError:
+        return None
+
+
+def upgrade(engine) -> int:
+    version = applied_version(engine)
+    if version is not None and version >= LATEST_VERSION:
+        return version
+
+    with engine.begin() as conn:
+        if conn.dialect.name == "postgresql":
+            conn.execute(text("SELECT pg_advisory_xact_lock(:id)"), {"id": MIGRATION_LOCK_ID})
+
+        version_metadata.create_all(conn, checkfirst=True)
+        version = current_version(conn)
+
+        for number, description, fn in MIGRATIONS:
+            if number <= version:
+                continue
+            logger.info("Applying migration %d: %s", number, description)
+            fn(conn)
+            conn.execute(schema_version.insert().values(version=number, description=description))
+            version = number
+
+    return version
+
+
+if __name__ == "__main__":
+    from .database import engine
+
+    logging.basicConfig(level=logging.INFO)
+
+    if sys.argv[1:] == ["current"]:
+        with engine.connect() as conn:
+            print(current_version(conn))
+    elif not sys.argv[1:]:
+        print("Schema at version", upgrade(engine))
+    else:
+        sys.exit("usage: python -m app.migrations [current]")
@@ -5,8 +5,12 @@ from sqlalchemy import (
     Text,
     ForeignKey,
     DateTime,
+    Date,
     JSON,
-    Boolean
+    Boolean,
+    SmallInteger,
+    Index,
+    text
 )
 from sqlalchemy.orm import relationship
 from datetime import datetime
@@ -40,7 +44,10 @@ class Department(Base):
 # ======================================================
 class User(Base):
     __tablename__ = "users"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_users_role_department", "role", "department_id"),
+        {"extend_existing": True}
+    )
 
     id = Column(Integer, primary_key=True)
     username = Column(String, unique=True, nullable=False)
@@ -63,7 +70,19 @@ class User(Base):
 # ======================================================
 class Questionnaire(Base):
     __tablename__ = "questionnaires"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_questionnaires_dept_active_created", "department_id", "is_active", "created_at"),
+        Index("ix_questionnaires_active_created", "is_active", "created_at"),
+        # at most one active questionnaire per department
+        Index(
+            "uq_questionnaires_one_active",
+            "department_id",
+            unique=True,
+            sqlite_where=text("is_active = 1"),
+            postgresql_where=text("is_active")
+        ),
+        {"extend_existing": True}
+    )
 
     id = Column(Integer, primary_key=True)
 
@@ -97,13 +116,37 @@ class Questionnaire(Base):
         cascade="all, delete-orphan"
     )
 
+    daily_rollups = relationship(
+        "EvaluationDailyRollup",
+        cascade="all, delete-orphan"
+    )
+
+    question_rollups = relationship(
+        "EvaluationQuestionRollup",
+        cascade="all, delete-orphan"
+    )
+
+    submission_keys = relationship(
+        "EvaluationSubmissionKey",
+        cascade="all, delete-orphan"
+    )
+
+    feedback_summaries = relationship(
+        "FeedbackChunkSummary",
+        cascade="all, delete-orphan"
+    )
+
 
 # ======================================================
 # EVALUATION RESPONSE
 # ======================================================
 class EvaluationResponse(Base):
     __tablename__ = "evaluation_responses"
-    __table_args__ = {"extend_existing": True}
+    __table_args__ = (
+        Index("ix_evaluation_responses_questionnaire", "questionnaire_id", "id"),
+        Index("ix_evaluation_responses_questionnaire_submitted", "questionnaire_id", "submitted_at"),
+        {"extend_existing": True}
+    )
 
     id = Column(Integer, primary_key=True)
 
@@ -114,10 +157,14 @@ class EvaluationResponse(Base):
     )
 
     name = Column(String, nullable=True)
+    # as typed by the client, for display only
     date = Column(String)
     time = Column(String)
     client_category = Column(String)
 
+    # server clock (UTC); NULL only for old rows whose date could not be parsed
+    submitted_at = Column(DateTime, default=datetime.utcnow)
+
     ratings = Column(JSON, nullable=False)
 
     feedback_type = Column(String)
@@ -126,4 +173,130 @@ class EvaluationResponse(Base):
     questionnaire = relationship(
         "Questionnaire",
         back_populates="responses"
-    )
\ No newline at end of file
+    )
+
+    scores = relationship(
+        "EvaluationScore",
+        cascade="all, delete-orphan"
+    )
+
+
+# ======================================================
+# EVALUATION SCORES (ONE ROW PER ANSWERED QUESTION)
+# ======================================================
+# Queryable copy of `ratings`: per-question averages and distributions
+# become indexed SQL aggregates instead of decoding JSON row by row.
+class EvaluationScore(Base):
+    __tablename__ = "evaluation_scores"
+    __table_args__ = (
+        Index("ix_evaluation_scores_questionnaire_question", "questionnaire_id", "question_idx", "score"),
+        {"extend_existing": True}
+    )
+
+    response_id = Column(
+        Integer,
+        ForeignKey("evaluation_responses.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    question_idx = Column(SmallInteger, primary_key=True)
+
+    # denormalized so aggregates never touch evaluation_responses
+    questionnaire_id = Column(Integer, nullable=False)
+
+    score = Column(SmallInteger, nullable=False)
+
+
+# ======================================================
+# EVALUATION ROLLUPS (MAINTAINED ON SUBMIT)
+# ======================================================
+class EvaluationDailyRollup(Base):
+    __tablename__ = "evaluation_daily_rollups"
+    __table_args__ = {"extend_existing": True}
+
+    questionnaire_id = Column(
+        Integer,
+        ForeignKey("questionnaires.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    day = Column(Date, primary_key=True)
+    client_category = Column(String, primary_key=True, default="")
+
+    responses = Column(Integer, nullable=False, default=0)
+
+
+class EvaluationQuestionRollup(Base):
+    __tablename__ = "evaluation_question_rollups"
+    __table_args__ = {"extend_existing": True}
+
+    questionnaire_id = Column(
+        Integer,
+        ForeignKey("questionnaires.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    question_idx = Column(Integer, primary_key=True)
+    day = Column(Date, primary_key=True)
+    client_category = Column(String, primary_key=True, default="")
+
+    total = Column(Integer, nullable=False, default=0)
+    count = Column(Integer, nullable=False, default=0)
+    star_1 = Column(Integer, nullable=False, default=0)
+    star_2 = Column(Integer, nullable=False, default=0)
+    star_3 = Column(Integer, nullable=False, default=0)
+    star_4 = Column(Integer, nullable=False, default=0)
+    star_5 = Column(Integer, nullable=False, default=0)
+
+
+
+# ======================================================
+# IDEMPOTENCY KEYS (OFFLINE BATCH SYNC)
+# ======================================================
+class EvaluationSubmissionKey(Base):
+    __tablename__ = "evaluation_submission_keys"
+    __table_args__ = {"extend_existing": True}
+
+    key = Column(String, primary_key=True)
+
+    questionnaire_id = Column(
+        Integer,
+        ForeignKey("questionnaires.id", ondelete="CASCADE"),
+        nullable=False
+    )
+
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+
+
+# ======================================================
+# AI REPLY CACHE (OPTIONAL PERSISTENCE)
+# ======================================================
+class AIReplyCache(Base):
+    __tablename__ = "ai_reply_cache"
+    __table_args__ = {"extend_existing": True}
+
+    key = Column(String(64), primary_key=True)
+    model = Column(String, nullable=False)
+    reply = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+
+# ======================================================
+# FEEDBACK SUMMARIES (MAP STEP, ONE ROW PER CHUNK)
+# ======================================================
+# Covers the feedback of responses first_response_id..last_response_id;
+# later runs only summarize responses past the highest last_response_id.
+class FeedbackChunkSummary(Base):
+    __tablename__ = "feedback_chunk_summaries"
+    __table_args__ = {"extend_existing": True}
+
+    questionnaire_id = Column(
+        Integer,
+        ForeignKey("questionnaires.id", ondelete="CASCADE"),
+        primary_key=True
+    )
+    first_response_id = Column(Integer, primary_key=True)
+    last_response_id = Column(Integer, nullable=False)
+
+    message_count = Column(Integer, nullable=False)
+    model = Column(String, nullable=False)
+    summary = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
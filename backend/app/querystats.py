@@ -0,0 +1,103 @@
+from contextvars import ContextVar
+from time import perf_counter
+import os
+
+from sqlalchemy import event
+
+from .metrics import sql_latency, sql_operation
+
+# ======================================================
+# CONFIG
+# ======================================================
+# Test mode: any statement past a route's declared budget raises, so
+# N+1 regressions fail loudly instead of just getting slower.
+QUERY_BUDGET_ENFORCE = os.getenv("QUERY_BUDGET_ENFORCE", "0") == "1"
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryStats:
+    __slots__ = ("count", "elapsed", "budget")
+
+    def __init__(self):
+        self.count = 0
+        self.elapsed = 0.0
+        self.budget = None
+
+
+_request_stats: ContextVar = ContextVar("request_query_stats", default=None)
+
+
+def current_query_stats():
+    return _request_stats.get()
+
+# ======================================================
+# ENGINE HOOKS
+# ======================================================
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started", []).append(perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = perf_counter() - conn.info["query_started"].pop()
+    sql_latency.observe(sql_operation(statement), value=elapsed)
+
+    stats = _request_stats.get()
+    if stats is None:
+        return
+
+    stats.count += 1
+    stats.elapsed += elapsed
+
+    if QUERY_BUDGET_ENFORCE and stats.budget is not None and stats.count > stats.budget:
+        raise QueryBudgetExceeded(
+            f"Query budget of {stats.budget} exceeded by: {statement}"
+        )
+
+
+def install_query_stats(engine):
+    if event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+# ======================================================
+# ROUTE BUDGET (USE AS A ROUTE DEPENDENCY)
+# ======================================================
+def query_budget(limit: int):
+    async def declare_budget():
+        stats = _request_stats.get()
+        if stats is not None:
+            stats.budget = limit
+
+    return declare_budget
+
+# ======================================================
+# ASGI MIDDLEWARE: X-Query-Count / X-Query-Time-Ms
+# ======================================================
+class QueryStatsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = QueryStats()
+        token = _request_stats.set(stats)
+
+        async def send_with_stats(message):
+            if message["type"] == "http.response.start":
+                headers = list(message.get("headers", []))
+                headers.append((b"x-query-count", str(stats.count).encode()))
+                headers.append((b"x-query-time-ms", f"{stats.elapsed * 1000:.2f}".encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_stats)
+        finally:
+            _request_stats.reset(token)
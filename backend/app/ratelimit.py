@@ -0,0 +1,254 @@
+"""
+Admission control for the unauthenticated / expensive endpoints.
+
+A token bucket per (endpoint class, client IP), plus a per-worker cap on
+concurrent AI requests. Runs as ASGI middleware, so a rejected request
+gets its 429 + Retry-After before routing, dependencies, a DB session
+or an upstream call.
+
+Off unless RATE_LIMIT_ENABLED=1: keyed on the wrong address, every
+client behind a proxy or a NAT shares one bucket. The client IP is the
+ASGI `client`, or with RATE_LIMIT_TRUSTED_HOPS=N the address N entries
+from the right of X-Forwarded-For, i.e. the one the outermost of N
+trusted proxies saw (1 behind a single proxy such as Render's).
+Requests with fewer entries keep the ASGI `client`.
+
+Bucket state lives in a backend: "memory" (per worker) or "sqlite" (a
+small shared file, so all workers on a host enforce one limit). SQLite
+takes run in the default executor so a busy file never blocks the loop.
+"""
+from threading import Lock
+import asyncio
+import json
+import logging
+import math
+import os
+import re
+import sqlite3
+import tempfile
+import time
+
+from .cache import LRUCache, MISSING
+from .metrics import rate_limited
+
+logger = logging.getLogger(__name__)
+
+# ======================================================
+# CONFIG
+# ======================================================
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "0") == "1"
+RATE_LIMIT_TRUSTED_HOPS = int(os.getenv("RATE_LIMIT_TRUSTED_HOPS", "0"))
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory | sqlite
+RATE_LIMIT_SQLITE_PATH = os.getenv(
+    "RATE_LIMIT_SQLITE_PATH", os.path.join(tempfile.gettempdir(), "evaluation-ratelimit.db")
+)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# "<requests>/<seconds>": bucket size and the window it refills over;
+# empty or 0 turns the class off
+ENDPOINT_LIMITS = {
+    "submit": os.getenv("RATE_LIMIT_SUBMIT", "30/60"),
+    "auth": os.getenv("RATE_LIMIT_AUTH", "10/60"),
+    "ai": os.getenv("RATE_LIMIT_AI", "10/60"),
+}
+
+# concurrent AI requests per worker; more are shed, not queued
+AI_MAX_CONCURRENCY = int(os.getenv("AI_MAX_CONCURRENCY", "8"))
+
+ENDPOINT_CLASSES = [
+    ("submit", re.compile(r"^/evaluations/(batch|[^/]+/submit)$")),
+    ("auth", re.compile(r"^/(login|register)$")),
+    ("ai", re.compile(r"^/(public/chat|chat|ai/chat)$")),
+]
+
+
+def parse_limit(spec: str):
+    """
+    "30/60" -> (capacity 30, refill 0.5 tokens/s); None when disabled.
+    """
+    requests, _, seconds = (spec or "").partition("/")
+    if not requests or int(requests) <= 0:
+        return None
+    return int(requests), int(requests) / float(seconds or 1)
+
+
+def endpoint_class(method: str, path: str):
+    if method != "POST":
+        return None
+    for name, pattern in ENDPOINT_CLASSES:
+        if pattern.match(path):
+            return name
+    return None
+
+
+def client_ip(scope, trusted_hops: int = RATE_LIMIT_TRUSTED_HOPS) -> str:
+    peer = scope["client"][0] if scope.get("client") else "unknown"
+    if trusted_hops <= 0:
+        return peer
+
+    forwarded = [
+        address.strip()
+        for name, value in scope.get("headers", [])
+        if name == b"x-forwarded-for"
+        for address in value.decode("latin-1").split(",")
+    ]
+    # entries left of the trusted ones are client-supplied
+    if len(forwarded) < trusted_hops or not forwarded[-trusted_hops]:
+        return peer
+    return forwarded[-trusted_hops]
+
+# ======================================================
+# BUCKET BACKENDS
+# ======================================================
+# take(key, capacity, refill_per_second) -> 0 when a token was taken,
+# else the seconds until one will be available.
+def _take(tokens: float, elapsed: float, capacity: int, rate: float):
+    tokens = min(capacity, tokens + elapsed * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryBackend:
+    """
+    Per worker: with N workers a client gets up to N times the limit.
+    """
+    blocking = False
+
+    def __init__(self, maxsize: int = RATE_LIMIT_MAX_KEYS):
+        self._buckets = LRUCache(maxsize=maxsize)
+        self._lock = Lock()
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        now = time.monotonic()
+        with self._lock:
+            bucket = self._buckets.get(key)
+            tokens, updated = (capacity, now) if bucket is MISSING else bucket
+            tokens, wait = _take(tokens, now - updated, capacity, rate)
+            self._buckets.set(key, (tokens, now))
+        return wait
+
+
+class SQLiteBackend:
+    """
+    Shared by every worker on the host through one SQLite file. State is
+    disposable, so the file skips fsync; each take is one short
+    BEGIN IMMEDIATE transaction, run off the event loop.
+    """
+    blocking = True
+    PRUNE_EVERY = 1000
+    IDLE_SECONDS = 3600
+
+    def __init__(self, path: str = RATE_LIMIT_SQLITE_PATH):
+        self._conn = sqlite3.connect(path, timeout=0.05, isolation_level=None, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_buckets ("
+            "key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL"
+            ") WITHOUT ROWID"
+        )
+        self._lock = Lock()
+        self._takes = 0
+
+    def take(self, key: str, capacity: int, rate: float) -> float:
+        # wall clock: monotonic clocks are not comparable across processes
+        now = time.time()
+        with self._lock:
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute("SELECT tokens, updated FROM rate_buckets WHERE key = ?", (key,)).fetchone()
+                tokens, updated = row if row else (capacity, now)
+                tokens, wait = _take(tokens, max(now - updated, 0), capacity, rate)
+                conn.execute(
+                    "INSERT INTO rate_buckets (key, tokens, updated) VALUES (?, ?, ?) "
+                    "ON CONFLICT (key) DO UPDATE SET tokens = excluded.tokens, updated = excluded.updated",
+                    (key, tokens, now)
+                )
+
+                self._takes += 1
+                if self._takes % self.PRUNE_EVERY == 0:
+                    conn.execute("DELETE FROM rate_buckets WHERE updated < ?", (now - self.IDLE_SECONDS,))
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+        return wait
+
+
+BACKENDS = {"memory": MemoryBackend, "sqlite": SQLiteBackend}
+
+# ======================================================
+# ASGI MIDDLEWARE
+# ======================================================
+class RateLimitMiddleware:
+    def __init__(self, app, backend=None, limits=None, ai_max_concurrency: int = AI_MAX_CONCURRENCY,
+                 trusted_hops: int = RATE_LIMIT_TRUSTED_HOPS):
+        self.app = app
+        self.backend = backend or BACKENDS[RATE_LIMIT_BACKEND]()
+        limits = ENDPOINT_LIMITS if limits is None else limits
+        self.limits = {name: parse_limit(spec) for name, spec in limits.items()}
+        self.ai_max_concurrency = ai_max_concurrency
+        self.ai_in_flight = 0
+        self.trusted_hops = trusted_hops
+
+    async def _wait(self, cls: str, client: str) -> float:
+        limit = self.limits.get(cls)
+        if limit is None:
+            return 0.0
+        try:
+            if getattr(self.backend, "blocking", False):
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(None, self.backend.take, f"{cls}:{client}", *limit)
+            return self.backend.take(f"{cls}:{client}", *limit)
+        except Exception as exc:
+            # fail open: a limiter problem must not take the API down
+            logger.warning("Rate limiter unavailable: %s", exc)
+            return 0.0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        cls = endpoint_class(scope["method"], scope["path"])
+        if cls is None:
+            await self.app(scope, receive, send)
+            return
+
+        wait = await self._wait(cls, client_ip(scope, self.trusted_hops))
+        if wait > 0:
+            rate_limited.inc(cls, "rate")
+            await _too_many_requests(send, wait)
+            return
+
+        if cls != "ai":
+            await self.app(scope, receive, send)
+            return
+
+        # LOAD SHEDDING: AI calls are slow and metered upstream
+        if self.ai_in_flight >= self.ai_max_concurrency:
+            rate_limited.inc(cls, "concurrency")
+            await _too_many_requests(send, 1)
+            return
+
+        self.ai_in_flight += 1
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.ai_in_flight -= 1
+
+
+async def _too_many_requests(send, wait: float):
+    body = json.dumps({"detail": "Too many requests"}).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": 429,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode()),
+            (b"retry-after", str(max(math.ceil(wait), 1)).encode()),
+        ],
+    })
+    await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,26 @@
+from fastapi.responses import JSONResponse
+import orjson
+
+# ======================================================
+# ORJSON RESPONSE
+# ======================================================
+class ORJSONResponse(JSONResponse):
+    """
+    Return this directly from handlers that build plain dicts/lists:
+    skips jsonable_encoder and json.dumps. Routes with a response_model
+    should keep the default class, which FastAPI serializes straight to
+    bytes through pydantic-core.
+    """
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+# ======================================================
+# COLUMN PROJECTION
+# ======================================================
+def columns(schema, model):
+    """
+    The model columns named by a response schema, in field order, for
+    select(*columns(Schema, Model)).
+    """
+    return [getattr(model, name) for name in schema.model_fields]
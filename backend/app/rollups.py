@@ -0,0 +1,217 @@
+from collections import defaultdict
+from datetime import date, datetime
+import sys
+
+from sqlalchemy import Date, case, cast, func
+from sqlalchemy.orm import Session
+
+from .database import dialect_insert
+from .models import (
+    EvaluationResponse,
+    EvaluationScore,
+    EvaluationDailyRollup,
+    EvaluationQuestionRollup
+)
+
+STAR_COLUMNS = ("star_1", "star_2", "star_3", "star_4", "star_5")
+UPSERT_CHUNK_SIZE = 500
+
+# bucket for old rows without submitted_at (their client date never
+# parsed): counted in summaries, left out of date ranges and trends
+UNDATED = date.min
+
+# ======================================================
+# BUCKET KEYS
+# ======================================================
+def response_day(value) -> date:
+    """
+    Day bucket for a response: the UTC day of `submitted_at` (a datetime,
+    or an ISO day string from SQL). Old rows without one go to UNDATED.
+    """
+    if isinstance(value, datetime):
+        return value.date()
+    try:
+        return date.fromisoformat((value or "")[:10])
+    except ValueError:
+        return UNDATED
+
+
+def submitted_day(dialect: str, column):
+    """
+    SQL day of a submitted_at column; NULL stays NULL.
+    """
+    if dialect == "postgresql":
+        return cast(column, Date)
+    return func.date(column)
+
+
+def _category(value) -> str:
+    return value or ""
+
+# ======================================================
+# ACCUMULATE (INCREMENTAL UPDATES)
+# ======================================================
+def _accumulate(rows, daily, questions):
+    """
+    rows: iterable of (questionnaire_id, submitted_at, client_category, ratings)
+    """
+    for questionnaire_id, day_value, category, ratings in rows:
+        day = response_day(day_value)
+        category = _category(category)
+
+        daily[(questionnaire_id, day, category)] += 1
+
+        for idx, score in enumerate(ratings or []):
+            bucket = questions[(questionnaire_id, idx, day, category)]
+            bucket["total"] += score
+            bucket["count"] += 1
+            if 1 <= score <= 5:
+                bucket[STAR_COLUMNS[score - 1]] += 1
+
+
+def _new_buckets():
+    return (
+        defaultdict(int),
+        defaultdict(lambda: dict.fromkeys(("total", "count") + STAR_COLUMNS, 0)),
+    )
+
+# ======================================================
+# UPSERT
+# ======================================================
+def _upsert(db: Session, model, keys, values, counters):
+    insert = dialect_insert(db)
+
+    for start in range(0, len(values), UPSERT_CHUNK_SIZE):
+        stmt = insert(model).values(values[start:start + UPSERT_CHUNK_SIZE])
+        stmt = stmt.on_conflict_do_update(
+            index_elements=keys,
+            set_={
+                name: getattr(model, name) + getattr(stmt.excluded, name)
+                for name in counters
+            }
+        )
+        db.execute(stmt)
+
+
+def _write(db: Session, daily, questions):
+    if daily:
+        _upsert(
+            db,
+            EvaluationDailyRollup,
+            ["questionnaire_id", "day", "client_category"],
+            [
+                {"questionnaire_id": qid, "day": day, "client_category": category, "responses": n}
+                for (qid, day, category), n in daily.items()
+            ],
+            ["responses"]
+        )
+
+    if questions:
+        _upsert(
+            db,
+            EvaluationQuestionRollup,
+            ["questionnaire_id", "question_idx", "day", "client_category"],
+            [
+                {"questionnaire_id": qid, "question_idx": idx, "day": day, "client_category": category, **bucket}
+                for (qid, idx, day, category), bucket in questions.items()
+            ],
+            ("total", "count") + STAR_COLUMNS
+        )
+
+# ======================================================
+# INCREMENTAL UPDATE (CALLER COMMITS)
+# ======================================================
+def apply_rollups(db: Session, responses):
+    """
+    Adds freshly submitted responses to the rollups inside the caller's
+    transaction, so counters and rows commit (or roll back) together.
+    """
+    apply_rollup_rows(
+        db,
+        ((r.questionnaire_id, r.submitted_at, r.client_category, r.ratings) for r in responses)
+    )
+
+
+def apply_rollup_rows(db: Session, rows):
+    """
+    Same as apply_rollups for plain (questionnaire_id, submitted_at,
+    client_category, ratings) tuples, e.g. from a bulk insert.
+    """
+    daily, questions = _new_buckets()
+    _accumulate(rows, daily, questions)
+    _write(db, daily, questions)
+
+# ======================================================
+# FULL REBUILD (BACKFILL)
+# ======================================================
+def rebuild_rollups(db: Session):
+    """
+    Recomputes both rollup tables from SQL aggregates: responses grouped
+    by (questionnaire, day of submitted_at, category) and evaluation_scores
+    grouped by question as well. Only the grouped rows reach Python.
+    """
+    counts = recompute_rollups(db)
+    db.commit()
+    return counts
+
+
+def recompute_rollups(db: Session):
+    """
+    rebuild_rollups without the commit, for callers that own the
+    transaction (migrations).
+    """
+    db.query(EvaluationQuestionRollup).delete(synchronize_session=False)
+    db.query(EvaluationDailyRollup).delete(synchronize_session=False)
+
+    daily, questions = _new_buckets()
+    response = EvaluationResponse
+    score = EvaluationScore
+    day = submitted_day(db.get_bind().dialect.name, response.submitted_at)
+
+    for qid, day_value, category, n in (
+        db.query(response.questionnaire_id, day, response.client_category, func.count())
+        .group_by(response.questionnaire_id, day, response.client_category)
+    ):
+        daily[(qid, response_day(day_value), _category(category))] += n
+
+    for qid, idx, day_value, category, total, count, *stars in (
+        db.query(
+            score.questionnaire_id,
+            score.question_idx,
+            day,
+            response.client_category,
+            func.sum(score.score),
+            func.count(),
+            *[func.sum(case((score.score == star, 1), else_=0)) for star in range(1, 6)],
+        )
+        .join(response, response.id == score.response_id)
+        .group_by(score.questionnaire_id, score.question_idx, day, response.client_category)
+    ):
+        bucket = questions[(qid, idx, response_day(day_value), _category(category))]
+        bucket["total"] += total or 0
+        bucket["count"] += count
+        for name, n in zip(STAR_COLUMNS, stars):
+            bucket[name] += n or 0
+
+    _write(db, daily, questions)
+
+    return {"daily": len(daily), "questions": len(questions)}
+
+
+# ======================================================
+# CLI: python -m app.rollups rebuild
+# ======================================================
+if __name__ == "__main__":
+    from .database import SessionLocal, engine
+    from .migrations import upgrade
+
+    if sys.argv[1:] != ["rebuild"]:
+        sys.exit("usage: python -m app.rollups rebuild")
+
+    upgrade(engine)
+
+    db = SessionLocal()
+    try:
+        print("Rebuilt rollups:", rebuild_rollups(db))
+    finally:
+        db.close()
@@ -1,5 +1,7 @@
 import uvicorn
 
+# Development server (auto-reload). Production: python -m app.serve
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
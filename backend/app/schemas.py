@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, conint
+from datetime import datetime
+from typing import Any, Dict, List, Optional
 
 # =========================
 # AUTH
@@ -24,7 +25,8 @@ class DepartmentWithUserCreate(BaseModel):
 
 
 class AssignHeadSchema(BaseModel):
-    department_id: int
+    username: str
+    department_id: Optional[int] = None  # the path's dept_id is used
 
 
 # =========================
@@ -42,11 +44,22 @@ class EvaluationSubmitSchema(BaseModel):
     date: str
     time: str
     client_category: str
-    ratings: List[int]
+    ratings: List[conint(ge=1, le=5)]
     feedback_type: str
     feedback_message: str
 
 
+class BatchEvaluationItem(EvaluationSubmitSchema):
+    questionnaire_id: int
+    idempotency_key: str
+
+
+class BatchEvaluationSubmitSchema(BaseModel):
+    # validated one by one (BatchEvaluationItem): a malformed item is
+    # reported as invalid instead of rejecting the whole replay
+    items: List[Dict[str, Any]]
+
+
 # =========================
 # EMAIL (FIXES 422 ERROR)
 # =========================
@@ -55,6 +68,11 @@ class SendEvaluationEmailSchema(BaseModel):
     link: str
 
 
+class BulkInvitationSchema(BaseModel):
+    recipients: List[str]
+    link: str
+
+
 # =========================
 # USER MANAGEMENT
 # =========================
@@ -72,4 +90,57 @@ class ResetPasswordSchema(BaseModel):
 # AI / CHAT (OPTIONAL)
 # =========================
 class ChatSchema(BaseModel):
-    message: str
\ No newline at end of file
+    message: str
+
+# =========================
+# RESPONSE MODELS
+# =========================
+# Validated straight from column-projected rows (see responses.columns);
+# only these fields are selected and returned.
+class UserOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    username: str
+    role: str
+    department_id: Optional[int] = None
+
+
+class QuestionnaireOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    content: str
+    department_id: int
+    created_by: int
+    created_at: Optional[datetime] = None
+    is_active: bool
+
+
+class EvaluationOut(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    questionnaire_id: int
+    name: Optional[str] = None
+    date: Optional[str] = None
+    time: Optional[str] = None
+    client_category: Optional[str] = None
+    ratings: List[int]
+    feedback_type: Optional[str] = None
+    feedback_message: Optional[str] = None
+    submitted_at: Optional[datetime] = None
+
+
+class EvaluationPage(BaseModel):
+    items: List[EvaluationOut]
+    next_cursor: Optional[int] = None
+
+
+class EvaluationSearchHit(EvaluationOut):
+    rank: float
+
+
+class EvaluationSearchPage(BaseModel):
+    items: List[EvaluationSearchHit]
+    next_offset: Optional[int] = None
@@ -0,0 +1,163 @@
+"""
+Full-text search over evaluation feedback (`name`, `feedback_message`).
+
+SQLite: an external-content FTS5 table, evaluation_responses_fts, kept in
+sync by insert/update/delete triggers, ranked by bm25. questionnaire_id
+is stored UNINDEXED, so search terms never match it; the department scope
+filters the matches before they are ranked.
+PostgreSQL: a stored generated tsvector column, search_vector, with a
+GIN index, ranked by ts_rank_cd.
+
+Both are created by migration 5 (the FTS5 table recreated by migration 8)
+and maintained by the database itself,
+so every write path (single submit, batches, group commit, seeding)
+stays indexed without application code.
+"""
+import re
+
+from sqlalchemy import column, func, literal_column, select, table, text
+
+from .models import EvaluationResponse
+from .responses import columns
+from .schemas import EvaluationOut
+
+FTS_TABLE = "evaluation_responses_fts"
+SEARCH_CONFIG = "english"
+
+# ======================================================
+# INDEX DDL (MIGRATIONS 5, 8)
+# ======================================================
+_SQLITE_DDL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        name, feedback_message, questionnaire_id UNINDEXED,
+        content='evaluation_responses', content_rowid='id',
+        tokenize='porter unicode61'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_insert AFTER INSERT ON evaluation_responses BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, name, feedback_message, questionnaire_id)
+        VALUES (new.id, new.name, new.feedback_message, new.questionnaire_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_delete AFTER DELETE ON evaluation_responses BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, feedback_message, questionnaire_id)
+        VALUES ('delete', old.id, old.name, old.feedback_message, old.questionnaire_id);
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_update
+    AFTER UPDATE OF name, feedback_message, questionnaire_id ON evaluation_responses BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, name, feedback_message, questionnaire_id)
+        VALUES ('delete', old.id, old.name, old.feedback_message, old.questionnaire_id);
+        INSERT INTO {FTS_TABLE}(rowid, name, feedback_message, questionnaire_id)
+        VALUES (new.id, new.name, new.feedback_message, new.questionnaire_id);
+    END
+    """,
+    # index the rows that existed before the triggers
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+]
+
+_POSTGRESQL_DDL = [
+    # names weigh more than message text; generated, so always in sync
+    f"""
+    ALTER TABLE evaluation_responses ADD COLUMN IF NOT EXISTS search_vector tsvector
+    GENERATED ALWAYS AS (
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('{SEARCH_CONFIG}', coalesce(feedback_message, '')), 'B')
+    ) STORED
+    """,
+    """
+    CREATE INDEX IF NOT EXISTS ix_evaluation_responses_search
+    ON evaluation_responses USING gin (search_vector)
+    """,
+]
+
+
+def create_search_index(conn):
+    ddl = {"sqlite": _SQLITE_DDL, "postgresql": _POSTGRESQL_DDL}.get(conn.dialect.name)
+    if ddl is None:
+        raise NotImplementedError(f"No full-text index for {conn.dialect.name}")
+
+    for statement in ddl:
+        conn.execute(text(statement))
+
+
+def drop_search_index(conn):
+    """SQLite only: the FTS5 table and its triggers."""
+    for trigger in ("insert", "delete", "update"):
+        conn.execute(text(f"DROP TRIGGER IF EXISTS {FTS_TABLE}_{trigger}"))
+    conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+
+# ======================================================
+# SEARCH QUERY
+# ======================================================
+def _fts5_terms(q: str) -> str:
+    """
+    User text -> FTS5 query: every word quoted (so `"`, `-`, `*`, NEAR
+    are plain text) and required, except that `or` between two words
+    means OR, as in PostgreSQL's websearch_to_tsquery.
+    """
+    parts = []
+    for word in re.findall(r"\w+", q):
+        if word.lower() == "or" and parts and parts[-1] != "OR":
+            parts.append("OR")
+        else:
+            parts.append(f'"{word}"')
+
+    if parts and parts[-1] == "OR":
+        parts.pop()
+    return " ".join(parts)
+
+
+def search_query(dialect: str, questionnaire_ids, q: str, offset: int = 0, limit: int = 50):
+    """
+    One page of ranked hits within `questionnaire_ids`: EvaluationOut
+    columns plus `rank` (higher is better). None when nothing can match.
+    """
+    if not questionnaire_ids:
+        return None
+
+    if dialect == "sqlite":
+        terms = _fts5_terms(q)
+        if not terms:
+            return None
+
+        match = f"{{name feedback_message}} : ({terms})"
+
+        # rank and page inside the index; only the page is joined.
+        # bm25 is lower-is-better: name counts double, questionnaire_id not at all
+        fts = table(FTS_TABLE, column("rowid"), column("questionnaire_id"))
+        bm25 = func.bm25(literal_column(FTS_TABLE), 2.0, 1.0, 0.0).label("bm25")
+        ranked = (
+            select(fts.c.rowid, bm25)
+            .where(
+                literal_column(FTS_TABLE).op("MATCH")(match),
+                fts.c.questionnaire_id.in_(questionnaire_ids)
+            )
+            .order_by(bm25, fts.c.rowid.desc())
+            .offset(offset)
+            .limit(limit)
+            .subquery()
+        )
+        return (
+            select(*columns(EvaluationOut, EvaluationResponse), (-ranked.c.bm25).label("rank"))
+            .join(ranked, EvaluationResponse.id == ranked.c.rowid)
+            .order_by(ranked.c.bm25, EvaluationResponse.id.desc())
+        )
+
+    tsquery = func.websearch_to_tsquery(SEARCH_CONFIG, q)
+    vector = literal_column("evaluation_responses.search_vector")
+    rank = func.ts_rank_cd(vector, tsquery)
+    return (
+        select(*columns(EvaluationOut, EvaluationResponse), rank.label("rank"))
+        .where(
+            EvaluationResponse.questionnaire_id.in_(questionnaire_ids),
+            vector.op("@@")(tsquery)
+        )
+        .order_by(rank.desc(), EvaluationResponse.id.desc())
+        .offset(offset)
+        .limit(limit)
+    )
@@ -0,0 +1,46 @@
+"""
+Creates the default admin / hr accounts if they are missing.
+
+    python -m app.seed
+
+Runs at startup in the default mode. With APP_STARTUP_MODE=fast the
+server skips it (and its pbkdf2 hashing), so run this once per database
+instead, e.g. as a release/deploy step.
+"""
+from .auth import hash_password
+from .models import User
+
+DEFAULT_USERS = (
+    ("admin", "admin123", "admin"),
+    ("hr", "hr123", "hr"),
+)
+
+
+def seed_default_users(db) -> list:
+    existing = {
+        username for (username,) in db.query(User.username).filter(
+            User.username.in_([username for username, _, _ in DEFAULT_USERS])
+        )
+    }
+
+    created = []
+    for username, password, role in DEFAULT_USERS:
+        if username not in existing:
+            db.add(User(username=username, password=hash_password(password), role=role))
+            created.append(username)
+
+    db.commit()
+    return created
+
+
+if __name__ == "__main__":
+    from .database import SessionLocal, engine
+    from .migrations import upgrade
+
+    upgrade(engine)
+    db = SessionLocal()
+    try:
+        created = seed_default_users(db)
+    finally:
+        db.close()
+    print("Created:", ", ".join(created) if created else "nothing (already seeded)")
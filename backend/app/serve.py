@@ -0,0 +1,128 @@
+"""
+Production entry point: N uvicorn workers behind one listening socket.
+
+    cd backend
+    python -m app.serve                      # WEB_CONCURRENCY or one per core
+    python -m app.serve --workers 4 --port 10000
+
+Migrations and default users run once here, before any worker exists,
+so workers start in fast mode and never race on DDL. The workers share
+a runtime directory holding the invalidation bus (app/invalidation.py),
+so cache writes in one worker reach the others, and the rate limiter's
+bucket file (app/ratelimit.py, when enabled), so limits hold across
+workers. For development use `python -m app.run`.
+
+Per-process pools are sized per worker here (see worker_defaults), so
+N workers share one budget of database connections and CPU cores
+instead of each taking a single process's defaults.
+
+Not shared: bulk invitation job status (GET /invitations/{id}) lives in
+the worker that queued the job, so with several workers most polls land
+elsewhere and 404. Run one worker, or use sticky sessions, if clients
+need to poll it.
+"""
+import argparse
+import os
+import shutil
+import tempfile
+
+import uvicorn
+
+# ======================================================
+# SERVER CONFIG
+# ======================================================
+HOST = os.getenv("HOST", "0.0.0.0")
+PORT = int(os.getenv("PORT", "8000"))
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", str(os.cpu_count() or 1)))
+
+# Longer than the load balancer's idle timeout (60 s on most), so the
+# proxy, not the worker, closes idle keep-alive connections.
+KEEPALIVE_TIMEOUT = int(os.getenv("KEEPALIVE_TIMEOUT", "75"))
+# Accept queue for connection bursts (capped by net.core.somaxconn)
+BACKLOG = int(os.getenv("BACKLOG", "2048"))
+GRACEFUL_SHUTDOWN_TIMEOUT = int(os.getenv("GRACEFUL_SHUTDOWN_TIMEOUT", "30"))
+# Optional: 503 past this many concurrent connections per worker
+LIMIT_CONCURRENCY = int(os.getenv("LIMIT_CONCURRENCY", "0")) or None
+# Optional: recycle a worker after this many requests
+MAX_REQUESTS = int(os.getenv("MAX_REQUESTS", "0")) or None
+
+# Connections all workers together may open (each worker has a sync and
+# an async engine); keep it under the server's max_connections
+DB_MAX_CONNECTIONS = int(os.getenv("DB_MAX_CONNECTIONS", "60"))
+
+
+def worker_defaults(workers: int) -> dict:
+    """
+    Per-worker pool sizes for settings the environment leaves unset.
+    One worker gets the single-process defaults (10 + 20 connections
+    per engine, one hashing process per core).
+    """
+    per_engine = max(2, DB_MAX_CONNECTIONS // (2 * workers))
+    pool_size = max(1, per_engine // 3)
+    return {
+        "DB_POOL_SIZE": str(pool_size),
+        "DB_MAX_OVERFLOW": str(per_engine - pool_size),
+        "PASSWORD_HASH_WORKERS": str(max(1, (os.cpu_count() or 1) // workers)),
+    }
+
+
+def prepare_database():
+    from .database import SessionLocal, engine
+    from .migrations import upgrade
+    from .seed import seed_default_users
+
+    upgrade(engine)
+    db = SessionLocal()
+    try:
+        seed_default_users(db)
+    finally:
+        db.close()
+
+    # workers open their own pools
+    engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default=HOST)
+    parser.add_argument("--port", type=int, default=PORT)
+    parser.add_argument("--workers", type=int, default=WEB_CONCURRENCY)
+    args = parser.parse_args()
+
+    prepare_database()
+    os.environ["APP_STARTUP_MODE"] = "fast"
+    for name, value in worker_defaults(args.workers).items():
+        os.environ.setdefault(name, value)
+
+    bus_dir = os.getenv("INVALIDATION_BUS_DIR")
+    owns_bus_dir = bus_dir is None
+    if owns_bus_dir:
+        bus_dir = tempfile.mkdtemp(prefix="evaluation-bus-")
+        os.environ["INVALIDATION_BUS_DIR"] = bus_dir
+
+    # one set of buckets for all workers, unless configured otherwise
+    if args.workers > 1:
+        os.environ.setdefault("RATE_LIMIT_BACKEND", "sqlite")
+    os.environ.setdefault("RATE_LIMIT_SQLITE_PATH", os.path.join(bus_dir, "ratelimit.db"))
+
+    try:
+        uvicorn.run(
+            "app.main:app",
+            host=args.host,
+            port=args.port,
+            workers=args.workers,
+            timeout_keep_alive=KEEPALIVE_TIMEOUT,
+            backlog=BACKLOG,
+            timeout_graceful_shutdown=GRACEFUL_SHUTDOWN_TIMEOUT,
+            limit_concurrency=LIMIT_CONCURRENCY,
+            limit_max_requests=MAX_REQUESTS,
+            proxy_headers=True,
+            access_log=False,
+        )
+    finally:
+        if owns_bus_dir:
+            shutil.rmtree(bus_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
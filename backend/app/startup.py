@@ -0,0 +1,53 @@
+"""
+Cold-start timeline: named phases measured from the moment main.py
+starts importing, closed by the first response to `/`. Logged once and
+served at /health/startup. Interpreter and server boot before that are
+only visible from outside (see bench/bench_startup.py).
+"""
+from time import perf_counter
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+APP_STARTUP_MODE = os.getenv("APP_STARTUP_MODE", "full")
+FAST_STARTUP = APP_STARTUP_MODE == "fast"
+
+STARTED = perf_counter()
+
+_phases = []
+_first_response = None
+
+
+def mark(phase: str):
+    _phases.append((phase, perf_counter() - STARTED))
+
+
+def first_response():
+    global _first_response
+
+    if _first_response is not None:
+        return
+    _first_response = perf_counter() - STARTED
+    logger.info("Startup (%s mode): %s", APP_STARTUP_MODE, ", ".join(
+        f"{p['phase']} +{p['took_ms']}ms" for p in report()["phases"]
+    ))
+
+
+def report() -> dict:
+    phases, previous = [], 0.0
+    timeline = _phases + ([("first_response", _first_response)] if _first_response is not None else [])
+
+    for phase, at in timeline:
+        phases.append({
+            "phase": phase,
+            "at_ms": round(at * 1000, 1),
+            "took_ms": round((at - previous) * 1000, 1)
+        })
+        previous = at
+
+    return {
+        "mode": APP_STARTUP_MODE,
+        "phases": phases,
+        "first_response_ms": round(_first_response * 1000, 1) if _first_response is not None else None
+    }
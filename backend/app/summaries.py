@@ -0,0 +1,264 @@
+"""
+Map-reduce AI summaries of client feedback messages.
+
+Map: each questionnaire's feedback, in response-id order, is cut into
+chunks of at most SUMMARY_CHUNK_TOKENS and every chunk is summarized,
+SUMMARY_CONCURRENCY upstream calls at a time. Chunk summaries are stored
+with the response-id range they cover, so later runs only map responses
+that arrived after them. The last stored chunk may be partial: when new
+feedback arrives it is re-chunked with it and, unless it turns out to be
+full already, summarized again as a larger chunk, so chunks only stay
+frozen once full.
+
+Reduce: summaries are merged SUMMARY_MERGE_FANIN at a time (and within
+the same token budget), level by level, until one is left. Merges are
+not stored; identical inputs are answered by the AI reply cache.
+"""
+from datetime import datetime
+import asyncio
+import os
+
+from sqlalchemy import delete, func, select
+
+from .ai import GROQ_MODEL, ask_ai
+from .database import AsyncSessionLocal, dialect_insert
+from .models import EvaluationResponse, FeedbackChunkSummary, Questionnaire
+
+# ======================================================
+# CONFIG
+# ======================================================
+SUMMARY_CHUNK_TOKENS = int(os.getenv("SUMMARY_CHUNK_TOKENS", "3000"))
+SUMMARY_CONCURRENCY = int(os.getenv("SUMMARY_CONCURRENCY", "4"))
+SUMMARY_MERGE_FANIN = int(os.getenv("SUMMARY_MERGE_FANIN", "8"))
+
+# rough English average; only used to size chunks, never billed
+CHARS_PER_TOKEN = 4
+
+CHUNK_PROMPT = (
+    "Summarize the following client feedback about a university office. "
+    "List the recurring themes, complaints and praise as at most 5 short "
+    "bullet points.\n\nFeedback:\n"
+)
+MERGE_PROMPT = (
+    "Combine these partial summaries of client feedback about a university "
+    "office into one summary of at most 5 short bullet points, keeping the "
+    "themes mentioned most often.\n\n"
+)
+
+# caps upstream calls across all concurrent summarizations in this worker
+_upstream_slots = asyncio.Semaphore(SUMMARY_CONCURRENCY)
+
+
+class SummaryFailed(Exception):
+    pass
+
+
+def estimate_tokens(text: str) -> int:
+    return len(text) // CHARS_PER_TOKEN + 1
+
+
+async def _ask(prompt: str) -> str:
+    async with _upstream_slots:
+        try:
+            return await ask_ai(prompt)
+        except Exception as exc:
+            raise SummaryFailed(f"AI request failed: {exc}") from exc
+
+# ======================================================
+# MAP: TOKEN-BOUNDED CHUNKS
+# ======================================================
+def _line(feedback_type, message: str, budget: int) -> str:
+    message = " ".join(message.split())
+    # a single message bigger than a whole chunk is cut to fit
+    message = message[:budget * CHARS_PER_TOKEN]
+    return f"- ({feedback_type}) {message}" if feedback_type else f"- {message}"
+
+
+def chunk_feedback(rows, budget: int = SUMMARY_CHUNK_TOKENS):
+    """
+    rows: (id, feedback_type, feedback_message) in id order.
+    Returns [(first_id, last_id, message_count, text)].
+    """
+    chunks, lines, ids, used = [], [], [], 0
+
+    def flush():
+        chunks.append((ids[0], ids[-1], len(ids), "\n".join(lines)))
+
+    for response_id, feedback_type, message in rows:
+        line = _line(feedback_type, message, budget)
+        tokens = estimate_tokens(line)
+        if lines and used + tokens > budget:
+            flush()
+            lines, ids, used = [], [], 0
+        lines.append(line)
+        ids.append(response_id)
+        used += tokens
+
+    if lines:
+        flush()
+    return chunks
+
+
+async def _map_questionnaire(questionnaire_id: int):
+    """
+    Returns (stored + new chunk summaries in order, message count, new chunk count).
+    """
+    async with AsyncSessionLocal() as db:
+        stored = (await db.execute(
+            select(
+                FeedbackChunkSummary.model,
+                FeedbackChunkSummary.first_response_id,
+                FeedbackChunkSummary.last_response_id,
+                FeedbackChunkSummary.message_count,
+                FeedbackChunkSummary.summary
+            )
+            .where(FeedbackChunkSummary.questionnaire_id == questionnaire_id)
+            .order_by(FeedbackChunkSummary.first_response_id)
+        )).all()
+
+        # summaries written by another model are redone, not mixed in
+        if any(row.model != GROQ_MODEL for row in stored):
+            await db.execute(delete(FeedbackChunkSummary).where(
+                FeedbackChunkSummary.questionnaire_id == questionnaire_id
+            ))
+            await db.commit()
+            stored = []
+
+        # re-read the last (possibly partial) chunk along with new responses
+        tail = stored[-1] if stored else None
+        watermark = tail.first_response_id - 1 if tail else 0
+
+        rows = (await db.execute(
+            select(
+                EvaluationResponse.id,
+                EvaluationResponse.feedback_type,
+                EvaluationResponse.feedback_message
+            )
+            .where(
+                EvaluationResponse.questionnaire_id == questionnaire_id,
+                EvaluationResponse.id > watermark,
+                func.length(func.trim(EvaluationResponse.feedback_message)) > 0
+            )
+            .order_by(EvaluationResponse.id)
+        )).all()
+
+    if tail is not None:
+        if not rows or rows[-1].id <= tail.last_response_id:
+            rows = []  # nothing new
+        else:
+            stored = stored[:-1]
+
+    # no connection is held while the model works
+    chunks = chunk_feedback(rows)
+
+    # the tail re-chunks to the same range when it was full: keep it
+    if chunks and tail is not None and chunks[0][:2] == (tail.first_response_id, tail.last_response_id):
+        chunks = chunks[1:]
+        stored.append(tail)
+        tail = None
+
+    results = await asyncio.gather(
+        *[_ask(CHUNK_PROMPT + text) for _, _, _, text in chunks],
+        return_exceptions=True
+    )
+
+    # keep only the leading successes: storing a chunk after a failed one
+    # would move the watermark past responses that were never summarized
+    done = []
+    for chunk, result in zip(chunks, results):
+        if isinstance(result, BaseException):
+            break
+        done.append((chunk, result))
+
+    if done:
+        async with AsyncSessionLocal() as db:
+            if tail is not None:
+                await db.execute(delete(FeedbackChunkSummary).where(
+                    FeedbackChunkSummary.questionnaire_id == questionnaire_id,
+                    FeedbackChunkSummary.first_response_id == tail.first_response_id,
+                    FeedbackChunkSummary.last_response_id == tail.last_response_id
+                ))
+            stmt = dialect_insert(db)(FeedbackChunkSummary).values([
+                {
+                    "questionnaire_id": questionnaire_id,
+                    "first_response_id": first_id,
+                    "last_response_id": last_id,
+                    "message_count": count,
+                    "model": GROQ_MODEL,
+                    "summary": summary,
+                    "created_at": datetime.utcnow(),
+                }
+                for (first_id, last_id, count, _), summary in done
+            ])
+            # a grown tail replaces the partial chunk it starts with; a
+            # concurrent request may have mapped the same or a larger one
+            await db.execute(stmt.on_conflict_do_update(
+                index_elements=["questionnaire_id", "first_response_id"],
+                set_={
+                    name: getattr(stmt.excluded, name)
+                    for name in ("last_response_id", "message_count", "model", "summary", "created_at")
+                },
+                where=FeedbackChunkSummary.last_response_id < stmt.excluded.last_response_id
+            ))
+            await db.commit()
+
+    if len(done) < len(chunks):
+        raise SummaryFailed(f"{len(chunks) - len(done)} of {len(chunks)} feedback chunks failed")
+
+    summaries = [row.summary for row in stored] + [summary for _, summary in done]
+    messages = sum(row.message_count for row in stored) + sum(c[2] for c, _ in done)
+    return summaries, messages, len(done)
+
+# ======================================================
+# REDUCE: HIERARCHICAL MERGE
+# ======================================================
+def _merge_groups(summaries, budget: int = SUMMARY_CHUNK_TOKENS, fanin: int = SUMMARY_MERGE_FANIN):
+    groups, current, used = [], [], 0
+    for summary in summaries:
+        tokens = estimate_tokens(summary)
+        # at least two per group so every level shrinks
+        if len(current) >= 2 and (len(current) >= fanin or used + tokens > budget):
+            groups.append(current)
+            current, used = [], 0
+        current.append(summary)
+        used += tokens
+
+    if current:
+        groups.append(current)
+    return groups
+
+
+def _merge_prompt(group) -> str:
+    parts = [f"Summary {n}:\n{summary}" for n, summary in enumerate(group, 1)]
+    return MERGE_PROMPT + "\n\n".join(parts)
+
+
+async def merge_summaries(summaries):
+    while len(summaries) > 1:
+        groups = _merge_groups(summaries)
+        # only the last group can be a single summary; it moves up as is
+        carried = groups.pop() if len(groups[-1]) == 1 else []
+        summaries = list(await asyncio.gather(*[_ask(_merge_prompt(group)) for group in groups])) + carried
+    return summaries[0] if summaries else None
+
+# ======================================================
+# ENTRY POINT
+# ======================================================
+async def summarize_feedback(department_id: int, questionnaire_id: int = None) -> dict:
+    async with AsyncSessionLocal() as db:
+        query = select(Questionnaire.id).where(Questionnaire.department_id == department_id)
+        if questionnaire_id is not None:
+            query = query.where(Questionnaire.id == questionnaire_id)
+        questionnaire_ids = (await db.scalars(query.order_by(Questionnaire.id))).all()
+
+    mapped = await asyncio.gather(*[_map_questionnaire(qid) for qid in questionnaire_ids])
+    summaries = [summary for chunk_summaries, _, _ in mapped for summary in chunk_summaries]
+    summary = await merge_summaries(summaries)
+
+    return {
+        "summary": summary,
+        "questionnaires": len(questionnaire_ids),
+        "messages": sum(messages for _, messages, _ in mapped),
+        "chunks": len(summaries),
+        "new_chunks": sum(new for _, _, new in mapped),
+    }
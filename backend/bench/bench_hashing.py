@@ -0,0 +1,89 @@
+"""
+Login throughput against the size of the password-hashing process pool.
+
+    cd backend
+    python -m bench.bench_hashing --requests 400 --concurrency 64
+
+Drives POST /login in-process through httpx's ASGI transport. "threads"
+is the old behaviour (pbkdf2 on the default thread executor, GIL-bound);
+each following row uses a process pool of that many workers.
+"""
+import argparse
+import asyncio
+import os
+import tempfile
+import time
+
+
+def _worker_counts():
+    counts, n = [], 1
+    while n < (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    counts.append(os.cpu_count() or 1)
+    return counts
+
+
+async def _run(app, requests: int, concurrency: int) -> float:
+    import httpx
+
+    limit = asyncio.Semaphore(concurrency)
+    credentials = {"username": "bench", "password": "bench-password"}
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            async with limit:
+                res = await client.post("/login", json=credentials)
+                res.raise_for_status()
+
+        # warm up: spawns pool workers and imports passlib in each
+        await asyncio.gather(*[one() for _ in range(concurrency)])
+
+        started = time.perf_counter()
+        await asyncio.gather(*[one() for _ in range(requests)])
+        return requests / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=64)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_hashing.db")
+
+    from app import auth
+    from app.database import SessionLocal, engine
+    from app.main import app
+    from app.migrations import upgrade
+    from app.models import User
+
+    upgrade(engine)
+    db = SessionLocal()
+    if not db.query(User).filter_by(username="bench").first():
+        db.add(User(username="bench", password=auth.hash_password("bench-password"), role="user"))
+        db.commit()
+    db.close()
+
+    get_hash_pool = auth.get_hash_pool
+    rows = []
+
+    # baseline: default thread executor
+    auth.get_hash_pool = lambda: None
+    rows.append(("threads", asyncio.run(_run(app, args.requests, args.concurrency))))
+    auth.get_hash_pool = get_hash_pool
+
+    for workers in _worker_counts():
+        auth.shutdown_hash_pool()
+        auth.PASSWORD_HASH_WORKERS = workers
+        rows.append((f"{workers} proc", asyncio.run(_run(app, args.requests, args.concurrency))))
+    auth.shutdown_hash_pool()
+
+    baseline = rows[0][1]
+    print(f"{'pool':>10} {'logins/s':>10} {'speedup':>8}")
+    for label, rate in rows:
+        print(f"{label:>10} {rate:>10.1f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
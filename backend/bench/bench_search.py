@@ -0,0 +1,62 @@
+"""
+Latency of /head/evaluations/search queries against a seeded database.
+
+    cd backend
+    python -m bench.seed --database-url sqlite:////tmp/bench.db --responses 1000000
+    python -m bench.bench_search --database-url sqlite:////tmp/bench.db
+
+Runs the endpoint's query (first page of 50) for a few terms, from
+matching almost nothing to matching a large share of the rows, in one
+department. The seeded feedback has only five distinct messages, so the
+common terms are a worst case for ranking.
+"""
+import argparse
+import os
+import statistics
+import time
+
+TERMS = ["rude", "unclear instructions", "late or rude", "service", "window", "nosuchword"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--terms", nargs="+", default=TERMS)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from sqlalchemy import func, select
+
+    from app.database import engine
+    from app.migrations import upgrade
+    from app.models import Questionnaire
+    from app.search import search_query
+
+    upgrade(engine)
+
+    with engine.connect() as conn:
+        department_id = conn.execute(select(func.min(Questionnaire.department_id))).scalar()
+        questionnaire_ids = conn.execute(
+            select(Questionnaire.id).where(Questionnaire.department_id == department_id)
+        ).scalars().all()
+
+        print(f"{'query':<24} {'hits/page':>9} {'p50 ms':>8} {'max ms':>8}")
+        for term in args.terms:
+            query = search_query(engine.dialect.name, questionnaire_ids, term, limit=args.limit)
+
+            timings = []
+            for _ in range(args.repeat):
+                started = time.perf_counter()
+                rows = conn.execute(query).all()
+                timings.append(time.perf_counter() - started)
+
+            print(f"{term:<24} {len(rows):>9} {statistics.median(timings) * 1000:>8.2f} "
+                  f"{max(timings) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
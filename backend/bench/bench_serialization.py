@@ -0,0 +1,81 @@
+"""
+Rows/second for the evaluation listing: ORM objects through
+jsonable_encoder vs. column-projected rows through a response model.
+
+    cd backend
+    python -m bench.bench_serialization --rows 500 --repeat 200
+
+"orm + jsonable_encoder" is the old path (select(EvaluationResponse),
+returned raw, encoded by FastAPI's generic encoder then json.dumps).
+"projected + response model" is what /head/evaluations does now: the
+rows are validated and dumped to JSON by pydantic-core. The orjson row
+is plain dicts through ORJSONResponse, as the dict endpoints use.
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+
+def _time(fn, repeat: int) -> float:
+    fn()
+    started = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - started) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--rows", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/bench_serialization.db")
+
+    from fastapi.encoders import jsonable_encoder
+    from pydantic import TypeAdapter
+    from sqlalchemy import select
+    from typing import List
+
+    from app.database import SessionLocal, engine
+    from app.models import EvaluationResponse
+    from app.responses import ORJSONResponse, columns
+    from app.schemas import EvaluationOut
+    from bench.seed import seed
+
+    seed(engine, departments=1, questionnaires=1, responses=args.rows)
+    adapter = TypeAdapter(List[EvaluationOut])
+    db = SessionLocal()
+
+    def orm_jsonable():
+        db.expunge_all()
+        items = db.scalars(select(EvaluationResponse).limit(args.rows)).all()
+        return json.dumps(jsonable_encoder(items)).encode()
+
+    def projected_model():
+        rows = db.execute(select(*columns(EvaluationOut, EvaluationResponse)).limit(args.rows)).all()
+        return adapter.dump_json(adapter.validate_python(rows))
+
+    def projected_orjson():
+        rows = db.execute(select(*columns(EvaluationOut, EvaluationResponse)).limit(args.rows)).all()
+        return ORJSONResponse([row._asdict() for row in rows]).body
+
+    assert json.loads(projected_model()) == json.loads(projected_orjson())
+
+    results = [
+        ("orm + jsonable_encoder", _time(orm_jsonable, args.repeat)),
+        ("projected + response model", _time(projected_model, args.repeat)),
+        ("projected + orjson", _time(projected_orjson, args.repeat)),
+    ]
+    db.close()
+
+    baseline = results[0][1]
+    print(f"{'path':<28} {'ms/page':>9} {'rows/s':>10} {'speedup':>8}")
+    for label, seconds in results:
+        print(f"{label:<28} {seconds * 1000:>9.2f} {args.rows / seconds:>10.0f} {baseline / seconds:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
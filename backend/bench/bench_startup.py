@@ -0,0 +1,88 @@
+"""
+Cold start: wall time from spawning uvicorn to the first `/` response,
+per APP_STARTUP_MODE, plus the server's own phase report.
+
+    cd backend
+    python -m bench.bench_startup --runs 5
+    python -m bench.bench_startup --database-url postgresql://localhost/evaluation_bench
+
+The database is migrated and seeded once up front, as it would be on a
+real wake-up; each run then starts a fresh server process.
+"""
+import argparse
+import json
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _get(url: str):
+    with urllib.request.urlopen(url, timeout=1) as res:
+        return json.loads(res.read())
+
+
+def start_once(mode: str):
+    port = _free_port()
+    base = f"http://127.0.0.1:{port}"
+    env = {**os.environ, "APP_STARTUP_MODE": mode}
+
+    started = time.perf_counter()
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env=env,
+    )
+    try:
+        while True:
+            try:
+                _get(base + "/")
+                break
+            except OSError:
+                if server.poll() is not None:
+                    raise RuntimeError("server exited during startup")
+                time.sleep(0.005)
+        elapsed = time.perf_counter() - started
+        return elapsed, _get(base + "/health/startup")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modes", nargs="+", default=["full", "fast"])
+    args = parser.parse_args()
+
+    os.environ["DATABASE_URL"] = args.database_url or f"sqlite:///{tempfile.mkdtemp()}/bench_startup.db"
+    subprocess.run([sys.executable, "-m", "app.seed"], cwd=BACKEND_DIR, env=os.environ, check=True,
+                   stdout=subprocess.DEVNULL)
+
+    for mode in args.modes:
+        timings, last = [], None
+        for _ in range(args.runs):
+            elapsed, last = start_once(mode)
+            timings.append(elapsed)
+
+        print(f"\n{mode}: first `/` after {statistics.median(timings) * 1000:.0f} ms "
+              f"(median of {args.runs}, min {min(timings) * 1000:.0f} ms)")
+        for phase in last["phases"]:
+            print(f"  {phase['phase']:<16} at {phase['at_ms']:>8.1f} ms  (+{phase['took_ms']:.1f})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Latency of /head/evaluations/trend queries against a seeded database.
+
+    cd backend
+    python -m bench.seed --database-url sqlite:////tmp/bench.db --responses 1000000
+    python -m bench.bench_trend --database-url sqlite:////tmp/bench.db
+
+Runs the endpoint's queries for one department, per bucket size, over
+the default range and over the whole seeded history.
+"""
+import argparse
+import os
+import statistics
+import time
+from datetime import datetime, timedelta
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from sqlalchemy import func, select
+
+    from app.database import SessionLocal, engine
+    from app.migrations import upgrade
+    from app.models import Questionnaire
+    from app.analytics import TREND_BUCKETS, TREND_SPAN, department_trend
+
+    upgrade(engine)
+
+    db = SessionLocal()
+    try:
+        department_id = db.scalar(select(func.min(Questionnaire.department_id)))
+        end = datetime.utcnow().date()
+
+        print(f"{'bucket':<8} {'range':>8} {'periods':>8} {'responses':>10} {'p50 ms':>8} {'max ms':>8}")
+        for bucket in TREND_BUCKETS:
+            for span in (TREND_SPAN[bucket], timedelta(days=3650)):
+                timings = []
+                for _ in range(args.repeat):
+                    started = time.perf_counter()
+                    trend = department_trend(db, department_id, bucket, end - span, end)
+                    timings.append(time.perf_counter() - started)
+
+                responses = sum(p["responses"] for p in trend["periods"])
+                print(f"{bucket:<8} {span.days:>7}d {len(trend['periods']):>8} {responses:>10} "
+                      f"{statistics.median(timings) * 1000:>8.1f} {max(timings) * 1000:>8.1f}")
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
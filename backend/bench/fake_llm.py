@@ -0,0 +1,93 @@
+"""
+Local stand-in for the Groq chat completions API.
+
+    cd backend
+    uvicorn bench.fake_llm:app --port 9000
+    GROQ_BASE_URL=http://127.0.0.1:9000 GROQ_API_KEY=test uvicorn app.main:app
+
+FAKE_LLM_LATENCY_MS delays each reply (and is spread across stream chunks)
+to mimic upstream latency.
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+import asyncio
+import json
+import os
+import time
+
+FAKE_LLM_LATENCY_MS = float(os.getenv("FAKE_LLM_LATENCY_MS", "200"))
+
+app = FastAPI(title="Fake completion server")
+
+# call counter, handy for asserting cache / coalescing behaviour
+stats = {"requests": 0}
+
+
+def _reply_for(prompt: str) -> str:
+    if "survey questions" in prompt.lower():
+        return json.dumps([f"Sample question {i} about the service?" for i in range(1, 6)])
+    if "client feedback" in prompt.lower():
+        # short and deterministic, like a real summary (see app/summaries.py)
+        return f"- Summary of {len(prompt)} characters of feedback"
+    return f"Echo: {prompt}"
+
+
+def _completion(model: str, content: str) -> dict:
+    return {
+        "id": f"fake-{stats['requests']}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [
+            {
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop",
+            }
+        ],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def _chunk(model: str, delta: dict, finish_reason=None) -> str:
+    payload = {
+        "id": f"fake-{stats['requests']}",
+        "object": "chat.completion.chunk",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+    }
+    return f"data: {json.dumps(payload)}\n\n"
+
+
+async def _stream(model: str, content: str):
+    words = content.split(" ")
+    delay = FAKE_LLM_LATENCY_MS / 1000 / max(len(words), 1)
+
+    yield _chunk(model, {"role": "assistant", "content": ""})
+    for i, word in enumerate(words):
+        await asyncio.sleep(delay)
+        yield _chunk(model, {"content": word if i == 0 else " " + word})
+    yield _chunk(model, {}, finish_reason="stop")
+    yield "data: [DONE]\n\n"
+
+
+@app.post("/openai/v1/chat/completions")
+async def chat_completions(request: Request):
+    body = await request.json()
+    stats["requests"] += 1
+
+    model = body.get("model", "fake")
+    prompt = body["messages"][-1]["content"]
+    content = _reply_for(prompt)
+
+    if body.get("stream"):
+        return StreamingResponse(_stream(model, content), media_type="text/event-stream")
+
+    await asyncio.sleep(FAKE_LLM_LATENCY_MS / 1000)
+    return _completion(model, content)
+
+
+@app.get("/stats")
+def get_stats():
+    return stats
@@ -0,0 +1,283 @@
+"""
+Latency / throughput benchmark for the API.
+
+    cd backend
+    python -m bench.seed --database-url sqlite:////tmp/bench.db --responses 1000000
+    python -m bench.loadtest --database-url sqlite:////tmp/bench.db --save sqlite-main
+    python -m bench.loadtest --database-url sqlite:////tmp/bench.db --compare sqlite-main
+    python -m bench.loadtest --target uvicorn --database-url postgresql://localhost/evaluation_bench
+
+--target asgi drives the real `app` in-process through httpx's ASGI
+transport; --target uvicorn starts `uvicorn app.main:app` on a local port
+and goes over TCP. Each scenario reports p50/p95/p99 latency and
+throughput. Baselines are JSON files in bench/baselines/; --compare exits
+non-zero when a scenario's p95 or throughput regresses past --threshold.
+"""
+from contextlib import asynccontextmanager
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import time
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines")
+SCENARIOS = ["login", "active_questionnaire", "submit", "head_listing", "department_listing"]
+
+# ======================================================
+# TARGETS
+# ======================================================
+@asynccontextmanager
+async def _lifespan(app):
+    """
+    Minimal ASGI lifespan driver: runs the app's startup/shutdown events
+    around an in-process benchmark.
+    """
+    inbox, outbox = asyncio.Queue(), asyncio.Queue()
+    task = asyncio.ensure_future(app({"type": "lifespan"}, inbox.get, outbox.put))
+
+    await inbox.put({"type": "lifespan.startup"})
+    message = await outbox.get()
+    if message["type"] != "lifespan.startup.complete":
+        raise RuntimeError(f"Startup failed: {message}")
+    try:
+        yield
+    finally:
+        await inbox.put({"type": "lifespan.shutdown"})
+        await outbox.get()
+        await task
+
+
+@asynccontextmanager
+async def asgi_client():
+    import httpx
+    from app.main import app
+
+    async with _lifespan(app):
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            yield client
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@asynccontextmanager
+async def uvicorn_client():
+    import httpx
+
+    port = _free_port()
+    backend_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    server = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port), "--log-level", "warning"],
+        cwd=backend_dir,
+        env=os.environ.copy(),
+    )
+    try:
+        limits = httpx.Limits(max_connections=1000, max_keepalive_connections=1000)
+        async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=60) as client:
+            deadline = time.monotonic() + 30
+            while True:
+                try:
+                    await client.get("/")
+                    break
+                except httpx.TransportError:
+                    if time.monotonic() > deadline:
+                        raise RuntimeError("uvicorn did not start")
+                    await asyncio.sleep(0.1)
+            yield client
+    finally:
+        server.terminate()
+        server.wait()
+
+# ======================================================
+# SCENARIOS
+# ======================================================
+def _discover():
+    """
+    Heads and active questionnaires created by bench.seed.
+    """
+    from app.database import SessionLocal
+    from app.models import Questionnaire, User
+
+    db = SessionLocal()
+    try:
+        heads = db.query(User.username, User.department_id).filter(
+            User.role == "head", User.username.like("head%")
+        ).all()
+        active = dict(db.query(Questionnaire.department_id, Questionnaire.id).filter(
+            Questionnaire.is_active == True
+        ).all())
+    finally:
+        db.close()
+
+    heads = [(username, dept) for username, dept in heads if dept in active]
+    if not heads:
+        raise SystemExit("No seeded departments found; run `python -m bench.seed` first")
+    return heads, active
+
+
+async def _token(client, username: str, password: str) -> dict:
+    res = await client.post("/login", json={"username": username, "password": password})
+    res.raise_for_status()
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+async def build_scenarios(client, rng: random.Random):
+    from bench.seed import HEAD_PASSWORD, CLIENT_CATEGORIES
+
+    heads, active = _discover()
+    username, dept = heads[0]
+    head_headers = await _token(client, username, HEAD_PASSWORD)
+    hr_headers = await _token(client, "hr", "hr123")
+
+    def submission():
+        return {
+            "date": time.strftime("%Y-%m-%d"),
+            "time": time.strftime("%H:%M"),
+            "client_category": rng.choice(CLIENT_CATEGORIES),
+            "ratings": [rng.randint(1, 5) for _ in range(5)],
+            "feedback_type": "Comment",
+            "feedback_message": "Benchmark submission",
+        }
+
+    return {
+        "login": lambda: client.post(
+            "/login", json={"username": rng.choice(heads)[0], "password": HEAD_PASSWORD}
+        ),
+        "active_questionnaire": lambda: client.get(
+            "/public/active-questionnaire", params={"department_id": rng.choice(heads)[1]}
+        ),
+        "submit": lambda: client.post(
+            f"/evaluations/{active[rng.choice(heads)[1]]}/submit", json=submission()
+        ),
+        "head_listing": lambda: client.get("/head/evaluations", headers=head_headers),
+        "department_listing": lambda: client.get("/departments", headers=hr_headers),
+    }
+
+# ======================================================
+# RUNNER
+# ======================================================
+def _percentile(sorted_values, pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    k = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[k]
+
+
+async def run_scenario(request, requests: int, concurrency: int) -> dict:
+    latencies, errors = [], 0
+    pending = iter(range(requests))
+
+    async def worker():
+        nonlocal errors
+        for _ in pending:
+            started = time.perf_counter()
+            res = await request()
+            latencies.append(time.perf_counter() - started)
+            if res.status_code >= 400:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*[worker() for _ in range(concurrency)])
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "throughput": round(requests / elapsed, 1),
+        "p50_ms": round(_percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(_percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(_percentile(latencies, 99) * 1000, 2),
+    }
+
+
+async def run(args) -> dict:
+    client_factory = uvicorn_client if args.target == "uvicorn" else asgi_client
+    rng = random.Random(42)
+    results = {}
+
+    async with client_factory() as client:
+        scenarios = await build_scenarios(client, rng)
+        for name in args.scenarios:
+            request = scenarios[name]
+            # warm-up: caches, pools, hashing workers
+            await run_scenario(request, min(args.concurrency * 2, args.requests), args.concurrency)
+            results[name] = await run_scenario(request, args.requests, args.concurrency)
+
+    return results
+
+# ======================================================
+# REPORTING + BASELINES
+# ======================================================
+def report(meta: dict, results: dict):
+    print(f"\n{meta['target']} / {meta['dialect']} — {meta['requests']} requests x {meta['concurrency']} concurrent")
+    print(f"{'scenario':<22} {'req/s':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'errors':>7}")
+    for name, r in results.items():
+        print(f"{name:<22} {r['throughput']:>9.1f} {r['p50_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['p99_ms']:>9.2f} {r['errors']:>7}")
+
+
+def compare(baseline: dict, results: dict, threshold: float) -> bool:
+    regressed = False
+    print(f"\n{'scenario':<22} {'req/s Δ':>9} {'p95 Δ':>9}")
+    for name, r in results.items():
+        base = baseline["results"].get(name)
+        if not base:
+            continue
+        throughput = (r["throughput"] - base["throughput"]) / base["throughput"] * 100
+        p95 = (r["p95_ms"] - base["p95_ms"]) / base["p95_ms"] * 100 if base["p95_ms"] else 0.0
+        flag = throughput < -threshold or p95 > threshold
+        regressed |= flag
+        print(f"{name:<22} {throughput:>+8.1f}% {p95:>+8.1f}%{'  REGRESSION' if flag else ''}")
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--target", choices=["asgi", "uvicorn"], default="asgi")
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--save", metavar="NAME", help="save results as bench/baselines/NAME.json")
+    parser.add_argument("--compare", metavar="NAME", help="compare against bench/baselines/NAME.json")
+    parser.add_argument("--threshold", type=float, default=10.0, help="regression threshold in percent")
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+    # every request comes from one client IP; measure the API, not the limiter
+    os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
+
+    from app.database import engine
+
+    results = asyncio.run(run(args))
+    meta = {
+        "target": args.target,
+        "dialect": engine.dialect.name,
+        "requests": args.requests,
+        "concurrency": args.concurrency,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+    }
+    report(meta, results)
+
+    if args.save:
+        os.makedirs(BASELINE_DIR, exist_ok=True)
+        with open(os.path.join(BASELINE_DIR, f"{args.save}.json"), "w") as fh:
+            json.dump({"meta": meta, "results": results}, fh, indent=2)
+
+    if args.compare:
+        with open(os.path.join(BASELINE_DIR, f"{args.compare}.json")) as fh:
+            if compare(json.load(fh), results, args.threshold):
+                sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,180 @@
+"""
+Synthetic dataset for benchmarks.
+
+    cd backend
+    python -m bench.seed --database-url sqlite:////tmp/bench.db --responses 1000000
+    python -m bench.seed --database-url postgresql://localhost/evaluation_bench
+
+Creates departments, one head per department (username head<N>,
+password "bench"), a few questionnaires per department with one active,
+and the requested number of EvaluationResponse rows (with their
+evaluation_scores), then rebuilds the rollups. Rows go in with
+executemany in chunks, so millions of rows seed in minutes.
+"""
+from datetime import datetime, timedelta
+import argparse
+import json
+import os
+import random
+import time
+
+CHUNK_SIZE = 10000
+HEAD_PASSWORD = "bench"
+CLIENT_CATEGORIES = ["Student", "Faculty", "Staff", "Alumni", "Visitor"]
+FEEDBACK = [
+    "Service was fast and friendly.",
+    "The line was long and the staff seemed late.",
+    "Instructions were unclear.",
+    "Very helpful office, thank you!",
+    "Staff was rude at the window.",
+]
+
+
+def _sync_sequences(engine):
+    """
+    Ids were inserted explicitly; move the SERIAL sequences past them.
+    """
+    from sqlalchemy import text
+
+    with engine.begin() as conn:
+        for table in ("departments", "users", "questionnaires", "evaluation_responses"):
+            conn.execute(text(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM {table}))"
+            ))
+
+
+def seed(engine, departments: int = 20, questionnaires: int = 3, questions: int = 5,
+         responses: int = 100000, days: int = 180, rng_seed: int = 42) -> dict:
+    from sqlalchemy import func, insert, select
+
+    from app.auth import hash_password
+    from app.database import SessionLocal
+    from app.migrations import upgrade
+    from app.models import Department, User, Questionnaire, EvaluationResponse, EvaluationScore
+    from app.rollups import rebuild_rollups
+
+    rng = random.Random(rng_seed)
+    upgrade(engine)
+
+    with engine.begin() as conn:
+        # one pbkdf2 hash shared by every synthetic head
+        password = hash_password(HEAD_PASSWORD)
+
+        dept_start = (conn.execute(select(func.max(Department.id))).scalar() or 0) + 1
+        dept_ids = list(range(dept_start, dept_start + departments))
+        conn.execute(insert(Department), [
+            {"id": d, "name": f"Bench Office {d}"} for d in dept_ids
+        ])
+
+        user_start = (conn.execute(select(func.max(User.id))).scalar() or 0) + 1
+        head_ids = {d: user_start + i for i, d in enumerate(dept_ids)}
+        conn.execute(insert(User), [
+            {"id": uid, "username": f"head{d}", "password": password, "role": "head", "department_id": d}
+            for d, uid in head_ids.items()
+        ])
+
+        q_start = (conn.execute(select(func.max(Questionnaire.id))).scalar() or 0) + 1
+        q_rows, active = [], {}
+        for i, d in enumerate(dept_ids):
+            for j in range(questionnaires):
+                qid = q_start + i * questionnaires + j
+                is_active = j == questionnaires - 1
+                content = {"service": f"Bench Office {d}", "questions": [f"Question {k + 1}" for k in range(questions)]}
+                q_rows.append({
+                    "id": qid,
+                    "content": json.dumps(content),
+                    "department_id": d,
+                    "created_by": head_ids[d],
+                    "is_active": is_active,
+                })
+                if is_active:
+                    active[d] = qid
+        conn.execute(insert(Questionnaire), q_rows)
+        qids = [row["id"] for row in q_rows]
+
+        response_id = (conn.execute(select(func.max(EvaluationResponse.id))).scalar() or 0) + 1
+
+    now = datetime.utcnow().replace(second=0, microsecond=0)
+    started = time.perf_counter()
+    remaining = responses
+
+    while remaining > 0:
+        n = min(CHUNK_SIZE, remaining)
+        response_rows, score_rows = [], []
+
+        for _ in range(n):
+            qid = rng.choice(qids)
+            ratings = [rng.choices((1, 2, 3, 4, 5), weights=(1, 2, 4, 6, 5))[0] for _ in range(questions)]
+            submitted_at = (now - timedelta(days=rng.randrange(days))).replace(
+                hour=rng.randrange(8, 17), minute=rng.randrange(60)
+            )
+            response_rows.append({
+                "id": response_id,
+                "questionnaire_id": qid,
+                "name": None,
+                "date": submitted_at.date().isoformat(),
+                "time": submitted_at.strftime("%H:%M"),
+                "submitted_at": submitted_at,
+                "client_category": rng.choice(CLIENT_CATEGORIES),
+                "ratings": ratings,
+                "feedback_type": "Comment",
+                "feedback_message": rng.choice(FEEDBACK),
+            })
+            score_rows.extend(
+                {"response_id": response_id, "questionnaire_id": qid, "question_idx": idx, "score": score}
+                for idx, score in enumerate(ratings)
+            )
+            response_id += 1
+
+        with engine.begin() as conn:
+            conn.execute(insert(EvaluationResponse), response_rows)
+            conn.execute(insert(EvaluationScore), score_rows)
+
+        remaining -= n
+
+    if engine.dialect.name == "postgresql":
+        _sync_sequences(engine)
+
+    db = SessionLocal()
+    try:
+        rebuild_rollups(db)
+    finally:
+        db.close()
+
+    return {
+        "departments": dept_ids,
+        "heads": {d: f"head{d}" for d in dept_ids},
+        "active_questionnaires": active,
+        "responses": responses,
+        "seconds": round(time.perf_counter() - started, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--database-url", default=os.getenv("DATABASE_URL"))
+    parser.add_argument("--departments", type=int, default=20)
+    parser.add_argument("--questionnaires", type=int, default=3)
+    parser.add_argument("--questions", type=int, default=5)
+    parser.add_argument("--responses", type=int, default=100000)
+    args = parser.parse_args()
+
+    if args.database_url:
+        os.environ["DATABASE_URL"] = args.database_url
+
+    from app.database import engine
+
+    result = seed(
+        engine,
+        departments=args.departments,
+        questionnaires=args.questionnaires,
+        questions=args.questions,
+        responses=args.responses,
+    )
+    print(f"Seeded {result['responses']} responses across {len(result['departments'])} departments "
+          f"in {result['seconds']}s")
+
+
+if __name__ == "__main__":
+    main()
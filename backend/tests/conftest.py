@@ -0,0 +1,69 @@
+import json
+import os
+import sys
+import tempfile
+
+import pytest
+
+# configure before app import: module-level settings are read once
+_db_dir = tempfile.mkdtemp(prefix="evaluation-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'test.db')}"
+os.environ["QUERY_BUDGET_ENFORCE"] = "1"
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+os.environ["INGEST_BUFFERED"] = "0"
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fastapi.testclient import TestClient  # noqa: E402
+
+from app.main import app  # noqa: E402
+
+
+def _auth(client, username, password):
+    res = client.post("/login", json={"username": username, "password": password})
+    assert res.status_code == 200, res.text
+    return {"Authorization": f"Bearer {res.json()['access_token']}"}
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as client:
+        yield client
+
+
+@pytest.fixture(scope="session")
+def seeded(client):
+    """
+    A department with a head, an active questionnaire and a few responses.
+    """
+    admin = _auth(client, "admin", "admin123")
+    hr = _auth(client, "hr", "hr123")
+
+    department = client.post("/departments", json={"name": "Registrar"}, headers=hr).json()
+    client.post("/register", json={"username": "head1", "password": "pw"})
+    head_id = next(u["id"] for u in client.get("/users", headers=admin).json() if u["username"] == "head1")
+    client.put(
+        f"/users/{head_id}",
+        json={"username": "head1", "role": "head", "department_id": department["id"]},
+        headers=admin
+    )
+    head = _auth(client, "head1", "pw")
+
+    content = json.dumps({"service": "Registrar", "questions": ["a", "b", "c"]})
+    questionnaire = client.post("/questionnaires", json={"content": content}, headers=head).json()
+    client.post(f"/questionnaires/{questionnaire['id']}/activate", headers=head)
+
+    for ratings in ([5, 4, 3], [2, 3, 4]):
+        res = client.post(f"/evaluations/{questionnaire['id']}/submit", json={
+            "date": "2026-01-02", "time": "10:00", "client_category": "Student",
+            "ratings": ratings, "feedback_type": "Comment", "feedback_message": "slow window",
+        })
+        assert res.status_code == 200, res.text
+
+    return {
+        "admin": admin,
+        "hr": hr,
+        "head": head,
+        "department_id": department["id"],
+        "questionnaire_id": questionnaire["id"],
+    }
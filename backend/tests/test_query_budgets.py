@@ -0,0 +1,58 @@
+"""
+Every budgeted route, driven through the app with QUERY_BUDGET_ENFORCE=1:
+a statement past the route's budget raises QueryBudgetExceeded, so an
+N+1 regression fails here instead of only slowing production down.
+"""
+from fastapi import Depends
+from sqlalchemy import text
+import pytest
+
+from app.main import app, get_db
+from app.querystats import QUERY_BUDGET_ENFORCE, QueryBudgetExceeded, query_budget
+
+# (method, path, role, budget, body); paths may use {qid}
+BUDGETED = [
+    ("POST", "/login", None, 1, {"username": "admin", "password": "admin123"}),
+    ("GET", "/users", "admin", 1, None),
+    ("GET", "/departments", "hr", 1, None),
+    ("GET", "/questionnaires", "head", 1, None),
+    ("GET", "/public/active-questionnaire", None, 1, None),
+    ("POST", "/evaluations/{qid}/submit", None, 5, {
+        "date": "2026-01-03", "time": "11:00", "client_category": "Staff",
+        "ratings": [4, 4, 4], "feedback_type": "Comment", "feedback_message": "fine",
+    }),
+    ("GET", "/head/evaluations", "head", 1, None),
+    ("GET", "/head/evaluations/search?q=slow", "head", 2, None),
+    ("GET", "/head/evaluations/summary", "head", 3, None),
+    ("GET", "/head/evaluations/trend?bucket=day", "head", 2, None),
+]
+
+
+def test_enforcement_is_on():
+    assert QUERY_BUDGET_ENFORCE
+
+
+@pytest.mark.parametrize("method,path,role,budget,body", BUDGETED, ids=[f"{m} {p}" for m, p, *_ in BUDGETED])
+def test_route_stays_within_budget(client, seeded, method, path, role, budget, body):
+    path = path.format(qid=seeded["questionnaire_id"])
+    if path == "/public/active-questionnaire":
+        path += f"?department_id={seeded['department_id']}"
+    headers = seeded[role] if role else {}
+
+    res = client.request(method, path, json=body, headers=headers)
+
+    assert res.status_code == 200, res.text
+    assert int(res.headers["x-query-count"]) <= budget
+
+
+def test_route_over_budget_fails(client):
+    @app.get("/_tests/over-budget", dependencies=[Depends(query_budget(1))])
+    async def over_budget(db=Depends(get_db)):
+        await db.execute(text("SELECT 1"))
+        await db.execute(text("SELECT 2"))
+
+    try:
+        with pytest.raises(QueryBudgetExceeded):
+            client.get("/_tests/over-budget")
+    finally:
+        app.router.routes.pop()
@@ -220,38 +220,40 @@ async function activateEvaluation(qid) {
 }
 
 /* ===============================
-   LOAD RESPONSES
+   LOAD RESPONSES (PAGED BY CURSOR)
 ================================ */
-async function loadResponses() {
-  const res = await fetch(`${API_BASE}/head/evaluations`, {
+let responsesCursor = null;
+
+async function loadResponses(cursor = null) {
+  const params = cursor ? `?cursor=${cursor}` : "";
+  const res = await fetch(`${API_BASE}/head/evaluations${params}`, {
     headers: { Authorization: `Bearer ${token}` }
   });
 
-  const data = await res.json();
+  const page = await res.json();
   const tbody = document.getElementById("responseTable");
   const avgBox = document.getElementById("avgRatingBox");
 
-  tbody.innerHTML = "";
-  avgBox.innerHTML = "";
+  document.getElementById("loadMoreRow")?.remove();
 
-  if (!data.length) {
-    tbody.innerHTML =
-      `<tr><td colspan="4">No responses yet</td></tr>`;
-    return;
-  }
+  if (!cursor) {
+    tbody.innerHTML = "";
+    avgBox.innerHTML = "";
+
+    if (!page.items.length) {
+      tbody.innerHTML =
+        `<tr><td colspan="4">No responses yet</td></tr>`;
+      return;
+    }
 
-  let total = 0, count = 0;
+    loadSummary();
+  }
 
-  data.forEach(r => {
+  page.items.forEach(r => {
     const stars = r.ratings
       .map(v => "★".repeat(v) + "☆".repeat(5 - v))
       .join("<br>");
 
-    r.ratings.forEach(v => {
-      total += v;
-      count++;
-    });
-
     tbody.innerHTML += `
       <tr>
         <td>${r.name || "Anonymous"}</td>
@@ -262,8 +264,64 @@ async function loadResponses() {
     `;
   });
 
+  responsesCursor = page.next_cursor;
+
+  if (responsesCursor) {
+    tbody.innerHTML += `
+      <tr id="loadMoreRow">
+        <td colspan="4">
+          <button onclick="loadResponses(responsesCursor)">Load more</button>
+        </td>
+      </tr>
+    `;
+  }
+}
+
+/* ===============================
+   RATING SUMMARY (SERVER-SIDE)
+================================ */
+async function loadSummary() {
+  const res = await fetch(`${API_BASE}/head/evaluations/summary`, {
+    headers: { Authorization: `Bearer ${token}` }
+  });
+
+  if (!res.ok) return;
+
+  const summary = await res.json();
+  const avgBox = document.getElementById("avgRatingBox");
+
+  if (summary.average === null) return;
+
   avgBox.innerHTML =
-    `⭐ Average Service Rating: <b>${(total / count).toFixed(2)} / 5</b>`;
+    `⭐ Average Service Rating: <b>${summary.average.toFixed(2)} / 5</b>` +
+    ` <small>(${summary.responses} responses)</small>`;
+}
+
+/* ===============================
+   🤖 AI FEEDBACK SUMMARY
+================================ */
+async function summarizeFeedback() {
+  const box = document.getElementById("aiSummary");
+  box.style.display = "block";
+  box.textContent = "Summarizing client feedback…";
+
+  try {
+    const res = await fetch(`${API_BASE}/head/evaluations/feedback-summary`, {
+      method: "POST",
+      headers: { Authorization: `Bearer ${token}` }
+    });
+
+    if (!res.ok) throw new Error();
+
+    const data = await res.json();
+
+    box.textContent = data.summary
+      ? `${data.summary}\n\n(${data.messages} feedback messages)`
+      : "No feedback messages to summarize yet.";
+
+  } catch {
+    box.textContent = "AI failed to summarize feedback.";
+  }
 }
 
 /* ===============================